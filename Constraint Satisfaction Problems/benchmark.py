@@ -0,0 +1,573 @@
+# Benchmarks for the constraint satisfaction solvers
+#
+# Usage:
+#   python benchmark.py memory [--timeout SECONDS]
+#   python benchmark.py propagation [--samples N] [--budget SECONDS]
+#   python benchmark.py backjump [--budget SECONDS]
+#   python benchmark.py batch [--instances N] [--regions N] [--chunksize N]
+#   python benchmark.py suite [--budget SECONDS] [--seeds N] [--json FILE]
+#   python benchmark.py startup [--runs N]
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from constraint_satisfaction import circuit_board, generators, map_problem, sat
+from constraint_satisfaction.instrumentation import Cutoff, SearchCancelled
+
+# Directory holding the solver package
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Circuit boards used by the benchmarks as name -> ((width, height), {component: (w, h)})
+BOARDS = {
+    'problem-1': ((10, 3), {'a': (3, 2), 'b': (5, 2), 'c': (2, 3), 'e': (7, 1)}),
+    'problem-2': ((12, 5), {'a': (6, 3), 'b': (8, 1), 'c': (3, 4), 'e': (3, 3), 'f': (3, 2), 'g': (5, 1)}),
+    'board-16x6': ((16, 6), {'a': (6, 3), 'b': (8, 1), 'c': (3, 4), 'e': (3, 3), 'f': (3, 2), 'g': (5, 1), 'h': (4, 2), 'i': (2, 5)}),
+    'board-32x16': ((32, 16), {'a': (9, 6), 'b': (12, 3), 'c': (5, 8), 'e': (7, 7), 'f': (6, 4), 'g': (10, 2), 'h': (4, 5), 'i': (3, 9), 'j': (8, 5), 'k': (11, 4)}),
+    'tight-12x10': ((12, 10), {'a': (6, 1), 'b': (3, 3), 'c': (1, 10), 'd': (6, 2), 'e': (3, 5), 'f': (3, 5), 'g': (3, 5), 'h': (9, 2), 'i': (2, 4), 'j': (2, 6)}),
+}
+
+# Boards used by the backjumping benchmark. On the thrash board the 26x3 block leaves a 30x2 band that
+# the three 11x2 parts only fit in two at a time, and MRV places the 1x3 parts in the pocket beside the
+# block first; chronological search retries every arrangement of those parts before moving the block.
+# Backjumping cuts it from 248795 nodes to 3311 under forward checking, 27131 to 427 under AC-3,
+# and with symmetry breaking from 1829 to 43 and from 409 to 16.
+BACKJUMP_BOARDS = {
+    'thrash-30x5': ((30, 5), {'a': (26, 3), 'p': (11, 2), 'q': (11, 2), 's': (11, 2), 'm': (1, 3), 'n': (1, 3), 'o': (1, 3), 'r': (1, 3)}),
+    'tight-12x10': BOARDS['tight-12x10'],
+}
+
+# Circuit board engines compared by the memory benchmark
+ENGINES = ['backtrack', 'trail', 'dlx']
+
+# Propagation methods compared by the propagation benchmark
+PROPAGATIONS = ['legacy', 'forward', 'ac3']
+
+# Generated maps used by the suite as (regions, share of borders kept)
+MAP_SUITE = [(regions, tightness) for regions in [10, 20, 40, 80] for tightness in [0.6, 0.9]]
+
+# Generated boards used by the suite as (width, height, components, share of the board covered)
+BOARD_SUITE = [size + (tightness,) for size in [(8, 4, 4), (12, 6, 6), (16, 8, 8), (24, 12, 12)] for tightness in [0.8, 1.0]]
+
+# Heuristic mixes of the map search as (variable order, value order, domain representation)
+MAP_MIXES = [(variable_order, value_order, 'list') for variable_order in ['degree', 'mrv', 'dsatur'] for value_order in ['lcv', 'domain']]
+MAP_MIXES += [(variable_order, value_order, 'bitmask') for variable_order in ['degree', 'mrv'] for value_order in ['lcv', 'domain']]
+
+# Heuristic mixes of the trailed circuit board search as (variable order, value order)
+BOARD_MIXES = [('mrv', 'board'), ('mrv', 'lcv'), ('degree', 'board'), ('degree', 'lcv'), ('impact', 'board'), ('mrv-degree', 'board')]
+
+# Colors used by the generated map instances
+COLORS = ['r', 'g', 'b']
+
+# Raised to stop a search once its time budget is spent
+class BudgetExceeded(Exception):
+    pass
+
+# Check if the original search can represent a board; it keys components by their dimensions
+def distinctComponents(board):
+
+    variables = BOARDS[board][1]
+
+    return len(set(variables.values())) == len(variables)
+
+# Get the peak resident set size of this process in kilobytes
+def peakRSS():
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+# Solve one board with one engine and print its time and peak memory as JSON
+def memoryWorker(engine, board):
+
+    constraints, variables = BOARDS[board]
+    problem = circuit_board.CSP(variables, [], constraints)
+
+    # Load numpy now, since printing the solution imports it on first use, so the growth is the search's own
+    import numpy
+
+    # Record the peak memory before the search starts
+    baseline = peakRSS()
+    start = time.perf_counter()
+
+    # Silence the solver's printing while we measure it
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = problem.csp_solver(engine)
+
+    print(json.dumps({'seconds': time.perf_counter() - start, 'baseline': baseline, 'peak': peakRSS(), 'solved': result != 'failure'}))
+
+# Compare the peak memory of the deepcopy search and the trailed search in fresh processes
+def memoryBenchmark(timeout):
+
+    print('%-12s %-10s %10s %14s %14s %14s' % ('board', 'engine', 'seconds', 'baseline KB', 'peak KB', 'growth KB'))
+
+    for board in BOARDS:
+        for engine in ENGINES:
+
+            # The original search merges components that share dimensions
+            if engine == 'backtrack' and not distinctComponents(board):
+                print('%-12s %-10s %10s' % (board, engine, 'n/a'))
+                continue
+
+            # Run each measurement in its own interpreter so peaks do not carry over
+            try:
+                completed = subprocess.run([sys.executable, __file__, 'memory-worker', engine, board], capture_output=True, text=True, timeout=timeout, check=True)
+            except subprocess.TimeoutExpired:
+                print('%-12s %-10s %10s' % (board, engine, 'timeout'))
+                continue
+
+            stats = json.loads(completed.stdout.strip().splitlines()[-1])
+            print('%-12s %-10s %10.3f %14d %14d %14d' % (board, engine, stats['seconds'], stats['baseline'], stats['peak'], stats['peak'] - stats['baseline']))
+
+# Place a random subset of components at random non-overlapping locations
+def randomPlacements(circuit_board, constraints, variables, rng):
+
+    bitboard = circuit_board.Bitboard(constraints[0], constraints[1], variables.values())
+    names = list(variables)
+    rng.shuffle(names)
+
+    placements = {}
+    occupied = 0
+
+    # Try to place half of the components
+    for name in names[:len(names) // 2]:
+        masks = bitboard.masks[variables[name]]
+        free = [location for location, mask in masks.items() if not mask & occupied]
+
+        if free:
+            location = rng.choice(free)
+            placements[name] = location
+            occupied |= masks[location]
+
+    return placements
+
+# Apply a partial placement with one propagation method and count the values left for the other components
+def prunedState(circuit_board, constraints, variables, placements, propagation):
+
+    problem = circuit_board.CSP(variables, [], constraints)
+
+    # The original arc consistency method works on the dimension-keyed assignment
+    if propagation == 'legacy':
+        with contextlib.redirect_stdout(io.StringIO()):
+            assignment = problem.getAssignment()
+        for name, location in placements.items():
+            assignment[variables[name]] = [location]
+
+        consistent, assignment = problem.arcConsistency(assignment)
+        remaining = sum(len(assignment[variables[name]]) for name in variables if name not in placements)
+
+        return remaining, not consistent
+
+    # The trailed search propagates each placement in turn
+    search = circuit_board.TrailSearch(problem, propagation=propagation)
+    consistent = True
+    for name, location in placements.items():
+        consistent = search.assign(search.names.index(name), location)
+        if not consistent:
+            break
+
+    remaining = sum(search.store.size(variable) for variable, name in enumerate(search.names) if name not in placements)
+
+    return remaining, not consistent
+
+# Run a search under a time budget, returning (nodes, backtracks, seconds, result) with result None on a timeout
+def runCounted(searcher, run, budget):
+
+    # Searches that take a cutoff enforce the budget themselves and count their own nodes
+    if hasattr(searcher, 'cutoff'):
+        searcher.cutoff = Cutoff(deadline=budget)
+        start = time.perf_counter()
+
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = run()
+        except SearchCancelled:
+            result = None
+
+        return searcher.stats.nodes, searcher.stats.backtracks, time.perf_counter() - start, result
+
+    # The original board solver takes no cutoff, so its backtrack is wrapped instead
+    counts = [0, 0]
+    backtrack = searcher.backtrack
+    deadline = time.perf_counter() + budget
+
+    # Wrap the instance's backtrack so recursive calls are counted too
+    def counted(*args):
+        counts[0] += 1
+        if time.perf_counter() > deadline:
+            raise BudgetExceeded()
+        result = backtrack(*args)
+
+        # A node that runs out of values backtracks to its parent
+        if result is False or result == 'failure':
+            counts[1] += 1
+        return result
+
+    searcher.backtrack = counted
+    start = time.perf_counter()
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = run()
+    except BudgetExceeded:
+        result = None
+
+    return counts[0], counts[1], time.perf_counter() - start, result
+
+# Solve a board under a time budget, returning (nodes, seconds, solved)
+def countNodes(circuit_board, constraints, variables, propagation, budget):
+
+    problem = circuit_board.CSP(variables, [], constraints)
+
+    # Count calls to the recursive backtrack method of either search
+    if propagation == 'legacy':
+        searcher, run = problem, lambda: problem.csp_solver() != 'failure'
+    else:
+        search = circuit_board.TrailSearch(problem, propagation=propagation)
+        searcher, run = search, lambda: search.solve() != 'failure'
+
+    nodes, backtracks, seconds, solved = runCounted(searcher, run, budget)
+
+    return nodes, seconds, solved
+
+# Compare the pruning power and node throughput of the original arc consistency, forward checking and AC-3
+def propagationBenchmark(samples, budget):
+
+
+    print('Pruning after placing half the components (%d random placements per board)\n' % samples)
+    print('%-12s %-8s %16s %12s' % ('board', 'method', 'values left', 'dead ends'))
+
+    for board, (constraints, variables) in BOARDS.items():
+        rng = random.Random(board)
+        placements = [randomPlacements(circuit_board, constraints, variables, rng) for sample in range(samples)]
+
+        for propagation in PROPAGATIONS:
+
+            # The original search merges components that share dimensions
+            if propagation == 'legacy' and not distinctComponents(board):
+                print('%-12s %-8s %16s' % (board, propagation, 'n/a'))
+                continue
+
+            states = [prunedState(circuit_board, constraints, variables, placement, propagation) for placement in placements]
+            remaining = sum(state[0] for state in states) / float(samples)
+            dead = sum(1 for state in states if state[1])
+            print('%-12s %-8s %16.1f %12d' % (board, propagation, remaining, dead))
+
+    print('\nFull solves (budget %.0f seconds)\n' % budget)
+    print('%-12s %-8s %10s %10s %12s %8s' % ('board', 'method', 'nodes', 'seconds', 'nodes/sec', 'solved'))
+
+    for board, (constraints, variables) in BOARDS.items():
+        for propagation in PROPAGATIONS:
+
+            if propagation == 'legacy' and not distinctComponents(board):
+                print('%-12s %-8s %10s' % (board, propagation, 'n/a'))
+                continue
+
+            nodes, seconds, solved = countNodes(circuit_board, constraints, variables, propagation, budget)
+            status = 'timeout' if solved is None else str(solved)
+            print('%-12s %-8s %10d %10.3f %12.0f %8s' % (board, propagation, nodes, seconds, nodes / max(seconds, 1e-9), status))
+
+# Compare chronological backtracking with conflict-directed backjumping under each propagation method
+def backjumpBenchmark(budget):
+
+    print('%-12s %-8s %-9s %-14s %10s %10s %10s %8s' % ('board', 'method', 'symmetry', 'search', 'nodes', 'backjumps', 'seconds', 'solved'))
+
+    for board, (constraints, variables) in BACKJUMP_BOARDS.items():
+        for propagation in ['forward', 'ac3']:
+            for symmetry in [False, True]:
+                for backjump in [False, True]:
+                    search = circuit_board.TrailSearch(circuit_board.CSP(variables, [], constraints), propagation=propagation, backjump=backjump, symmetry=symmetry)
+                    nodes, backtracks, seconds, solved = runCounted(search, lambda: search.solve() != 'failure', budget)
+                    status = 'timeout' if solved is None else str(solved)
+                    mode = 'backjump' if backjump else 'chronological'
+                    print('%-12s %-8s %-9s %-14s %10d %10d %10.3f %8s' % (board, propagation, symmetry, mode, nodes, search.stats.backjumps, seconds, status))
+
+# Generate a random map colouring instance with a planted colouring, so every instance is solvable
+def randomMap(rng, regions):
+
+    variables = ['r%d' % index for index in range(regions)]
+    planted = {region: rng.choice(COLORS) for region in variables}
+
+    # Link regions of different planted colors, with about three neighbors each
+    constraints = []
+    for i in range(regions):
+        for j in range(i + 1, regions):
+            if planted[variables[i]] != planted[variables[j]] and rng.random() < 3.0 / regions:
+                constraints.append((variables[i], variables[j]))
+
+    return variables, list(COLORS), constraints
+
+# Check a map colouring against the constraints of its instance
+def validColoring(instance, result):
+
+    variables, domains, constraints = instance
+
+    return result != 'failure' and all(result[a] != result[b] for a, b in constraints) and all(result[region] in domains for region in variables)
+
+# Compare serial solving with the batch pool at increasing worker counts
+def batchBenchmark(count, regions, chunksize):
+
+    rng = random.Random(regions)
+    instances = [randomMap(rng, regions) for index in range(count)]
+
+    print('%d instances of %d regions, chunks of %d\n' % (count, regions, chunksize))
+    print('%-10s %-10s %10s %14s %16s %8s' % ('workers', 'order', 'seconds', 'instances/sec', 'per core/sec', 'solved'))
+
+    # Solve in this process as the baseline
+    start = time.perf_counter()
+    results = map_problem.solveChunk(list(enumerate(instances)))
+    seconds = time.perf_counter() - start
+    solved = sum(1 for index, result in results if validColoring(instances[index], result))
+    print('%-10s %-10s %10.3f %14.0f %16.0f %8d' % ('serial', '-', seconds, count / seconds, count / seconds, solved))
+
+    # Double the pool each time up to the number of cores
+    workers = 1
+    while True:
+        for ordered in [True, False]:
+            start = time.perf_counter()
+            results = list(map_problem.solveBatch(iter(instances), workers, chunksize, ordered))
+            seconds = time.perf_counter() - start
+            solved = sum(1 for index, result in results if validColoring(instances[index], result))
+            order = 'input' if ordered else 'completion'
+            print('%-10d %-10s %10.3f %14.0f %16.0f %8d' % (workers, order, seconds, count / seconds, count / seconds / workers, solved))
+
+        if workers >= (os.cpu_count() or 1):
+            break
+        workers = min(2 * workers, os.cpu_count() or 1)
+
+# Solve one instance twice, once timed and once under tracemalloc, and return its record
+def measure(solver, build, budget):
+
+    # Time the search and count its nodes without the tracing overhead
+    searcher, run = build()
+    nodes, backtracks, seconds, status = runCounted(searcher, run, budget)
+
+    # Repeat it with allocation tracing for the peak memory
+    traced, run = build()
+    tracemalloc.start()
+    try:
+        runCounted(traced, run, budget)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    record = {'solver': solver, 'seconds': seconds, 'nodes': nodes, 'backtracks': backtracks, 'peak_kb': peak // 1024, 'status': status or 'timeout'}
+
+    # Add the counters and heuristic timings the search recorded; they also cover searches without a backtrack method
+    record.update(searcher.stats.asDict())
+
+    return record
+
+# Build a map search with a heuristic mix, returning (searcher, run)
+def mapSearch(map_problem, instance, variable_order, value_order, representation='list'):
+
+    problem = map_problem.CSP(*instance, variable_order=variable_order, value_order=value_order, representation=representation)
+
+    # Report invalid colourings apart from failures
+    def run():
+        result = problem.solve()
+        if result == 'failure':
+            return 'failed'
+        return 'solved' if validColoring(instance, result) else 'invalid'
+
+    return problem, run
+
+# Build a min-conflicts map search, returning (searcher, run)
+def localSearch(map_problem, instance):
+
+    problem = map_problem.CSP(*instance)
+
+    # Report invalid colourings apart from failures
+    def run():
+        result = problem.solveLocal()
+        if result == 'failure':
+            return 'failed'
+        return 'solved' if validColoring(instance, result) else 'invalid'
+
+    return problem, run
+
+# Build a trailed board search with a heuristic mix, returning (searcher, run)
+def boardSearch(circuit_board, board, variable_order, value_order, capacity=False, restarts=None):
+
+    constraints, variables = board
+    search = circuit_board.TrailSearch(circuit_board.CSP(variables, [], constraints), variable_order, value_order, capacity=capacity, restarts=restarts)
+
+    return search, lambda: 'solved' if search.solve() != 'failure' else 'failed'
+
+# Build an exact cover board search, returning (searcher, run)
+def exactCoverSearch(circuit_board, board):
+
+    constraints, variables = board
+    search = circuit_board.ExactCoverSearch(circuit_board.CSP(variables, [], constraints))
+
+    return search, lambda: 'solved' if search.solve() != 'failure' else 'failed'
+
+# Build a CDCL search over a SAT encoding, returning (searcher, run)
+def satSearch(encoding):
+
+    solver = sat.CDCLSolver(encoding.formula)
+
+    return solver, lambda: 'solved' if solver.solve() is not None else 'failed'
+
+# Run every heuristic mix of both solvers over the generated suites
+def suiteBenchmark(budget, seeds, output):
+
+    records = []
+
+    header = '%-22s %-22s %4s %10s %10s %11s %10s %8s'
+    row = '%-22s %-22s %4d %10.3f %10d %11d %10d %8s'
+    print(header % ('instance', 'mix', 'seed', 'seconds', 'nodes', 'backtracks', 'peak KB', 'status'))
+
+    for regions, tightness in MAP_SUITE:
+        for seed in range(seeds):
+            instance = generators.randomPlanarMap(seed, regions, tightness)
+            name = 'map-%d-%.1f' % (regions, tightness)
+
+            for variable_order, value_order, representation in MAP_MIXES:
+                record = measure('map', lambda: mapSearch(map_problem, instance, variable_order, value_order, representation), budget)
+                mix = variable_order + '+' + value_order + ('+bitmask' if representation == 'bitmask' else '')
+                record.update({'instance': name, 'mix': mix, 'seed': seed})
+                records.append(record)
+                print(row % (name, record['mix'], seed, record['seconds'], record['nodes'], record['backtracks'], record['peak_kb'], record['status']))
+
+            # Local search has no heuristic mixes
+            record = measure('map', lambda: localSearch(map_problem, instance), budget)
+            record.update({'instance': name, 'mix': 'min-conflicts', 'seed': seed})
+            records.append(record)
+            print(row % (name, record['mix'], seed, record['seconds'], record['nodes'], record['backtracks'], record['peak_kb'], record['status']))
+
+            # Nor has the CDCL solver over the SAT encoding
+            record = measure('map', lambda: satSearch(sat.MapEncoding(map_problem.CSP(*instance))), budget)
+            record.update({'instance': name, 'mix': 'sat', 'seed': seed})
+            records.append(record)
+            print(row % (name, record['mix'], seed, record['seconds'], record['nodes'], record['backtracks'], record['peak_kb'], record['status']))
+
+    for width, height, components, tightness in BOARD_SUITE:
+        for seed in range(seeds):
+            board = generators.randomBoard(seed, width, height, components, tightness)
+            name = 'board-%dx%d-%d-%.1f' % (width, height, components, tightness)
+
+            for variable_order, value_order in BOARD_MIXES:
+                record = measure('board', lambda: boardSearch(circuit_board, board, variable_order, value_order), budget)
+                record.update({'instance': name, 'mix': variable_order + '+' + value_order, 'seed': seed})
+                records.append(record)
+                print(row % (name, record['mix'], seed, record['seconds'], record['nodes'], record['backtracks'], record['peak_kb'], record['status']))
+
+            # MRV again with the free area bound pruning doomed nodes
+            record = measure('board', lambda: boardSearch(circuit_board, board, 'mrv', 'board', capacity=True), budget)
+            record.update({'instance': name, 'mix': 'mrv+board+capacity', 'seed': seed})
+            records.append(record)
+            print(row % (name, record['mix'], seed, record['seconds'], record['nodes'], record['backtracks'], record['peak_kb'], record['status']))
+
+            # MRV again restarting on the Luby schedule with dom/wdeg weights
+            record = measure('board', lambda: boardSearch(circuit_board, board, 'mrv', 'board', restarts='luby'), budget)
+            record.update({'instance': name, 'mix': 'mrv+board+luby', 'seed': seed})
+            records.append(record)
+            print(row % (name, record['mix'], seed, record['seconds'], record['nodes'], record['backtracks'], record['peak_kb'], record['status']))
+
+            # The exact cover engine has no heuristic mixes
+            record = measure('board', lambda: exactCoverSearch(circuit_board, board), budget)
+            record.update({'instance': name, 'mix': 'dlx', 'seed': seed})
+            records.append(record)
+            print(row % (name, record['mix'], seed, record['seconds'], record['nodes'], record['backtracks'], record['peak_kb'], record['status']))
+
+            # Nor has the CDCL solver over the SAT encoding
+            record = measure('board', lambda: satSearch(sat.BoardEncoding(board[1], circuit_board.CSP(board[1], [], board[0]).getBitboard())), budget)
+            record.update({'instance': name, 'mix': 'sat', 'seed': seed})
+            records.append(record)
+            print(row % (name, record['mix'], seed, record['seconds'], record['nodes'], record['backtracks'], record['peak_kb'], record['status']))
+
+    # Keep the raw records for comparing runs
+    if output:
+        with open(output, 'w') as file:
+            json.dump(records, file, indent=2)
+
+# Modules timed by the startup benchmark, from the bare package to each solver
+STARTUP_MODULES = ['constraint_satisfaction', 'constraint_satisfaction.map_problem', 'constraint_satisfaction.circuit_board']
+
+# Heavy modules a solver import should not pull in
+HEAVY_MODULES = ['numpy', 'asyncio', 'multiprocessing']
+
+# Time importing each solver module in fresh interpreters, as short-lived worker processes would
+def startupBenchmark(runs):
+
+    print('%-40s %12s %12s   %s' % ('module', 'import ms', 'process ms', 'heavy modules loaded'))
+
+    # Time the import inside the interpreter and report which heavy modules came with it
+    code = 'import sys, time; start = time.perf_counter(); import %s; print(time.perf_counter() - start, *[name for name in %r if name in sys.modules])'
+
+    for module in ['sys'] + STARTUP_MODULES:
+        imports, processes = [], []
+
+        for run in range(runs):
+            start = time.perf_counter()
+            completed = subprocess.run([sys.executable, '-c', code % (module, HEAVY_MODULES)], cwd=HERE, capture_output=True, text=True, check=True)
+            processes.append(time.perf_counter() - start)
+
+            fields = completed.stdout.split()
+            imports.append(float(fields[0]))
+
+        # Take the fastest run, which is the least disturbed by the rest of the machine
+        name = 'interpreter only' if module == 'sys' else module
+        print('%-40s %12.1f %12.1f   %s' % (name, 1000 * min(imports), 1000 * min(processes), ', '.join(fields[1:]) or '-'))
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Benchmark the constraint satisfaction solvers')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    # Peak memory of the circuit board engines
+    memory = commands.add_parser('memory', help='compare peak RSS of the circuit board engines')
+    memory.add_argument('--timeout', type=float, default=120, help='seconds allowed for each solve')
+
+    # Pruning power and node throughput of the propagation methods
+    propagation = commands.add_parser('propagation', help='compare pruning and nodes/sec of the propagation methods')
+    propagation.add_argument('--samples', type=int, default=20, help='random partial placements per board')
+    propagation.add_argument('--budget', type=float, default=30, help='seconds allowed for each solve')
+
+    # Node counts of chronological and conflict-directed search
+    backjump = commands.add_parser('backjump', help='compare chronological search with conflict-directed backjumping')
+    backjump.add_argument('--budget', type=float, default=30, help='seconds allowed for each solve')
+
+    # Throughput of the map colouring batch API
+    batch = commands.add_parser('batch', help='compare map colouring throughput of the batch pool')
+    batch.add_argument('--instances', type=int, default=2000, help='number of generated maps')
+    batch.add_argument('--regions', type=int, default=8, help='regions in each map')
+    batch.add_argument('--chunksize', type=int, default=64, help='instances sent to a worker at a time')
+
+    # Heuristic comparison over the generated instances
+    suite = commands.add_parser('suite', help='compare the heuristic mixes of both solvers on generated instances')
+    suite.add_argument('--budget', type=float, default=5, help='seconds allowed for each solve')
+    suite.add_argument('--seeds', type=int, default=1, help='instances generated at each size')
+    suite.add_argument('--json', dest='output', help='file to write the raw records to')
+
+    # Import time of the package and each solver
+    startup = commands.add_parser('startup', help='time importing the solvers in fresh interpreters')
+    startup.add_argument('--runs', type=int, default=10, help='interpreters started for each module')
+
+    # Internal entry point for a single memory measurement
+    worker = commands.add_parser('memory-worker')
+    worker.add_argument('engine', choices=ENGINES)
+    worker.add_argument('board', choices=list(BOARDS))
+
+    args = parser.parse_args()
+
+    if args.command == 'memory':
+        memoryBenchmark(args.timeout)
+    elif args.command == 'propagation':
+        propagationBenchmark(args.samples, args.budget)
+    elif args.command == 'backjump':
+        backjumpBenchmark(args.budget)
+    elif args.command == 'batch':
+        batchBenchmark(args.instances, args.regions, args.chunksize)
+    elif args.command == 'suite':
+        suiteBenchmark(args.budget, args.seeds, args.output)
+    elif args.command == 'startup':
+        startupBenchmark(args.runs)
+    elif args.command == 'memory-worker':
+        memoryWorker(args.engine, args.board)
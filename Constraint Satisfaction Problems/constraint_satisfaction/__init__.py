@@ -0,0 +1,5 @@
+# Constraint satisfaction solvers for map colouring and circuit board layout
+#
+# Importing the package loads nothing else; import the solver you need:
+#   from constraint_satisfaction import map_problem, circuit_board
+__all__ = ['circuit_board', 'map_problem', 'generators', 'instrumentation', 'loaders', 'sat']
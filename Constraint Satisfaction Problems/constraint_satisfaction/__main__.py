@@ -0,0 +1,4 @@
+# Run the demo problems with python -m constraint_satisfaction
+from .cli import main
+
+main()
@@ -0,0 +1,2488 @@
+# Ben Lehrburger
+# COSC 076 PA4
+import math
+import copy
+import os
+import random
+import time
+import sys
+from collections import deque, OrderedDict
+from itertools import islice
+from .instrumentation import SearchStats, SearchCancelled, Cutoff, RestartLimit, restartLimits, searchOutcome, runAsync
+from .sat import BoardEncoding, CDCLSolver
+
+# Largest number of entries in a pair's compatibility matrix; larger pairs are tested on demand
+TENSOR_LIMIT = 1 << 22
+
+# Wrap a CSP solver object for the circuit board problem
+class CSP:
+
+    def __init__(self, variables, domains, constraints, bitboard=False, hook=None):
+
+        # Variables list
+        self.variables = variables
+        # Domains list
+        self.domains = domains
+        # Constraints list of tuples
+        self.constraints = constraints
+        # Optional integer bitmask representation of the board
+        self.bitboard = None
+        # Optional callback for each search event, as hook(event, stats)
+        self.hook = hook
+        # Statistics of the latest solve
+        self.stats = SearchStats(hook)
+
+        # Precompute every placement mask if the bitboard representation is requested, or take one a loader built
+        if isinstance(bitboard, Bitboard):
+            self.bitboard = bitboard
+        elif bitboard:
+            self.bitboard = Bitboard(constraints[0], constraints[1], variables.values())
+
+    # Solve the CSP
+    def csp_solver(self, engine='backtrack'):
+
+        # Start fresh statistics for this solve
+        self.stats = SearchStats(self.hook)
+
+        # Search over trailed domains instead of copying the assignment at every node
+        if engine == 'trail':
+            result = self.trailSolver()
+
+        # Split the trailed search across worker processes
+        elif engine == 'parallel':
+            result = self.parallelSolver()
+
+        # Treat the board as an exact cover of cells and components
+        elif engine == 'dlx':
+            result = self.exactCoverSolver()
+
+        # Encode the board as SAT and run the CDCL solver
+        elif engine == 'sat':
+            result = self.satSolver()
+
+        # Otherwise recursively call the backtrack function
+        else:
+            return self.backtrack(self.getAssignment())
+
+        # Print the result in ASCII unless we have failed
+        if result == 'failure':
+            return result
+        return self.toASCII(result, self.variables, self.constraints)
+
+    # Solve the CSP with undoable domain changes, returning {component name: [location]} or 'failure'
+    def trailSolver(self, variable_order='mrv', value_order='board', propagation='forward', scoring='tensor', backjump=False, symmetry=False, memo=0, capacity=False, restarts=None, seed=0):
+
+        search = TrailSearch(self, variable_order, value_order, propagation, scoring, backjump, symmetry, memo, capacity, restarts, seed, self.hook)
+        self.stats = search.stats
+
+        return search.solve()
+
+    # Solve the CSP as an exact cover with Dancing Links, returning {component name: [location]} or 'failure'
+    def exactCoverSolver(self, symmetry=False):
+
+        search = ExactCoverSearch(self, symmetry, self.hook)
+        self.stats = search.stats
+
+        return search.solve()
+
+    # Solve the CSP as SAT with the built-in CDCL solver, returning {component name: [location]} or 'failure'
+    def satSolver(self):
+
+        encoding = BoardEncoding(self.variables, self.getBitboard())
+        solver = CDCLSolver(encoding.formula, self.hook)
+        self.stats = solver.stats
+
+        model = solver.solve()
+        if model is None:
+            return 'failure'
+
+        return encoding.decode(model)
+
+    # Write the SAT encoding of the CSP as DIMACS CNF to a path or an open text file
+    def writeCNF(self, target):
+
+        encoding = BoardEncoding(self.variables, self.getBitboard())
+        comments = ['circuit board of %d x %d with %d components' % (self.constraints[0], self.constraints[1], len(self.variables)),
+                    'one variable per placement, numbered component by component in board order']
+
+        encoding.formula.writeDimacs(target, comments)
+
+    # Get the CSP's bitboard, or build one without keeping it
+    def getBitboard(self):
+
+        if self.bitboard is not None:
+            return self.bitboard
+
+        return Bitboard(self.constraints[0], self.constraints[1], self.variables.values())
+
+    # Lazily yield every placement as {component name: [location]}, or only the first limit of them
+    def solutions(self, limit=None, variable_order='mrv', value_order='board', propagation='forward', scoring='tensor', symmetry=False, memo=0, capacity=False):
+
+        search = TrailSearch(self, variable_order, value_order, propagation, scoring, symmetry=symmetry, memo=memo, capacity=capacity, hook=self.hook)
+        self.stats = search.stats
+
+        # The search stays paused inside the generator until the next solution is asked for
+        return islice(search.solutions(), limit)
+
+    # Solve with the trailed search within a deadline in seconds and/or a node budget
+    #
+    # Returns {'status', 'solution', 'partial', 'stats'}, where status is 'solved', 'failure',
+    # 'deadline', 'budget' or 'cancelled' and partial is the deepest placement reached.
+    def solveWithin(self, deadline=None, budget=None, cutoff=None, **options):
+
+        search = TrailSearch(self, hook=self.hook, **options)
+        search.cutoff = cutoff or Cutoff(deadline, budget)
+        self.stats = search.stats
+
+        try:
+            result = search.solve()
+        except SearchCancelled as cancelled:
+            return searchOutcome(cancelled.reason, None, search.getPartial(), search.stats)
+
+        if result == 'failure':
+            return searchOutcome('failure', None, search.getPartial(), search.stats)
+        return searchOutcome('solved', result, result, search.stats)
+
+    # Solve like solveWithin on an executor thread, giving up early if the awaiting task is cancelled
+    async def solveAsync(self, deadline=None, budget=None, executor=None, **options):
+
+        cutoff = Cutoff(deadline, budget)
+
+        return await runAsync(lambda: self.solveWithin(cutoff=cutoff, **options), cutoff, executor)
+
+    # Solve the CSP on a pool of worker processes, returning {component name: [location]} or 'failure'
+    def parallelSolver(self, workers=None, budget=2000, **options):
+
+        # Import the process pool on first use so importing the solver stays fast
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+        # Use every core unless told otherwise
+        workers = workers or os.cpu_count() or 1
+        # Flag raised once a solution is found so running workers give up
+        stop = multiprocessing.get_context().Event()
+        # Statistics summed over every subproblem; hooks stay in the worker processes
+        self.stats = SearchStats(self.hook)
+
+        executor = ProcessPoolExecutor(workers, initializer=initWorker, initargs=(self.variables, self.domains, self.constraints, options, stop))
+        pending = set()
+
+        try:
+            # Start from the whole search tree; workers split off what they cannot finish within the node budget
+            pending = {executor.submit(solveSubproblem, [], budget)}
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    status, payload, stats = future.result()
+                    self.stats.merge(stats)
+
+                    # Return the first solution and cancel the other workers
+                    if status == 'solved':
+                        stop.set()
+                        for other in pending:
+                            other.cancel()
+                        return payload
+
+                    # Queue the unexplored remainder of an interrupted subproblem
+                    if status == 'split':
+                        for prefix in payload:
+                            pending.add(executor.submit(solveSubproblem, prefix, budget))
+
+            return 'failure'
+
+        # Drop the queued subproblems by hand, since shutdown only takes cancel_futures from Python 3.9
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    # Backtrack if we have an inconsistent value choice
+    def backtrack(self, assignment):
+
+        # Count the node
+        stats = self.stats
+        stats.nodes += 1
+        if stats.hook is not None:
+            stats.hook('nodes', stats)
+
+        # If all variables have been assigned values
+        if self.complete(assignment):
+            # Print the result in ASCII
+            return self.toASCII(assignment, self.variables, self.constraints)
+
+        # Choose a region to assign to based on MRV or DH heuristics
+        #region = self.minimumRemainingValue(assignment)
+        start = time.perf_counter()
+        region = self.degreeHeuristic(assignment)
+        stats.time('degreeHeuristic', start)
+        # Store the old assignment in case the current is inconsistent
+        old_value = assignment[region]
+
+        # Choose the least constraining values in order
+        start = time.perf_counter()
+        values = self.leastConstrainingValue(region, assignment)
+        stats.time('leastConstrainingValue', start)
+
+        for value in values:
+            # If that value is consistent
+            if self.isConsistent(value, region, assignment):
+
+                # Assign it to the current region
+                assignment[region] = [value]
+                start = time.perf_counter()
+                # Check for arc consistency
+                consistent = self.arcConsistency(assignment)[0]
+                # Get the assignment inferences from arc consistency method
+                new_assignment = self.arcConsistency(assignment)[1]
+                stats.time('arcConsistency', start)
+
+                # If the assignment is arc consistent
+                if consistent:
+                    # Recursively backtrack
+                    result = self.backtrack(new_assignment)
+
+                    # If our assignments are inconsistent
+                    if result != 'failure':
+                        # Return that we have failed
+                        return result
+
+            # If the value is inconsistent assign it to the old value
+            else:
+                assignment[region] = old_value
+
+        # If we run out of value, return that we have failed
+        stats.backtracks += 1
+        if stats.hook is not None:
+            stats.hook('backtracks', stats)
+        return 'failure'
+
+    # Check if our assignment is complete
+    def complete(self, assignment):
+
+        # Count the number of variables with just 1 assignment
+        completeness = 0
+
+        # For each key and value in our assignment
+        for key, value in assignment.items():
+
+            # Mark a key as complete if it has only 1 value assigned to it
+            if len(value) == 1 or value == []:
+                completeness += 1
+
+        # Return true if all variables are assigned
+        if completeness == len(self.variables):
+            return True
+
+        # Otherwise return false
+        return False
+
+    # Check if the current value is consistent with our other assignments
+    def isConsistent(self, location, region, assignment):
+
+        # Count the check
+        stats = self.stats
+        stats.checks += 1
+        if stats.hook is not None:
+            stats.hook('checks', stats)
+
+        # Get variables that have already been assigned
+        assigned = self.getAssignedVariables(assignment)
+
+        # Return true if no variables have been assigned
+        if len(assigned) == 0:
+            return True
+
+        # With a bitboard, test the placement mask against the occupied cells in one AND
+        if self.bitboard is not None:
+            return self.bitboard.fits(region, location, self.bitboard.occupancy(assigned))
+
+        # Get the spaces without a component on them
+        available_spaces = self.getAvailableSpaces(assignment)
+
+        # Get the spaces that the current component would take up given the current assignment
+        occupied_spaces = []
+        for x in range(0, region[0]):
+            for y in range(0, region[1]):
+                occupied_spaces.append((x + location[0], y + location[1]))
+
+        # Return false f the component would overlap an occupied space
+        for space in occupied_spaces:
+            if space not in available_spaces:
+                return False
+
+        # Return true if the current assignment is not off the board
+        if self.within_board(location, region):
+            return True
+
+        # Otherwise return false
+        else:
+            return False
+
+    # Get a list of the least constraining values in increasing order
+    def leastConstrainingValue(self, region, assignment):
+
+        # Dictionary of dictionaries
+        results = {}
+
+        # For each value in the current region's optional assignments
+        for value in assignment[region]:
+
+            # Initialize a new dictionary as the value of the results dictionary
+            constraints = {}
+            # Make a deepcopy of the current assignment so we can edit it
+            assignment_copy = copy.deepcopy(assignment)
+            # Simulate what the assignment would look like if we assigned the current value to the region
+            simulated_assignment = self.updateAssignment(assignment_copy, region, value)
+
+            # For each unassigned variable
+            for unassigned_variable in self.getUnassignedVariables(assignment):
+
+                # Get what potential values remain for that variable after our simulation
+                remaining_options = simulated_assignment[unassigned_variable]
+                # Add it to that value's dictionary
+                constraints[unassigned_variable] = remaining_options
+
+            # Add that value's dictionary to the results dictionary
+            results[value] = constraints
+
+        # Store the least constraining values in order
+        order = {}
+
+        # For each key and value in the results dictionary
+        for value, simulation in results.items():
+
+            # Count how many values remain for that simulation
+            value_counter = 0
+
+            # For each key and value in that simulation
+            for key, options in simulation.items():
+
+                # If there's no potential values for that region
+                if len(options) == 0:
+                    # Remove that assignment as an option because it's too constraining
+                    del results[value]
+
+                # Otherwise increment the number of remaining values
+                else:
+                    value_counter += len(options)
+
+            # Add to the order dictionary
+            order[value] = value_counter
+
+        # Initialize list to check if each variable still has eligible assignments
+        value_check = list(order.values())
+
+        # Return that we have failed if no variables have eligible assignments
+        if all(i == 0 for i in value_check):
+            return 'Failure'
+
+        # Otherwise order the list from least to most constraining
+        least_constraining_order = sorted(order, key=order.get, reverse=True)
+
+        return least_constraining_order
+
+    # Get the minimum remaining value
+    def minimumRemainingValue(self, assignment):
+
+        # Get unassigned variables
+        unassigned = self.getUnassignedVariables(assignment)
+        # Store the first as the MRV
+        minimum_remaining_value = unassigned[0]
+        # Store that variables restrictions as the number of potential values remaining
+        max_restrictions = len(assignment[minimum_remaining_value])
+
+        # For each unassigned variable
+        for variable in unassigned:
+
+            # If it has less restrictions than our minimum
+            if len(assignment[variable]) < max_restrictions:
+                # Store it as the MRV
+                minimum_remaining_value = variable
+                # Store its restrictions
+                max_restrictions = len(assignment[variable])
+
+        return minimum_remaining_value
+
+    # Get the variable involved with the largest number of constraints on other unassigned variables
+    def degreeHeuristic(self, assignment):
+
+        # Set available options as high as possible
+        available_options = math.inf
+        # Set dummy variable to hold subsequently chose region
+        most_constraining = None
+
+        # If there's only one unassigned variable left, return it
+        if len(self.getUnassignedVariables(assignment)) == 1:
+            return self.getUnassignedVariables(assignment)[0]
+
+        # For each unassigned variable
+        for unassigned_variable in self.getUnassignedVariables(assignment):
+
+            # Get that variable's assignments
+            value = assignment[unassigned_variable]
+            # Initialize a counter to count how many assignments would remain for other variables
+            available_options_counter = 0
+
+            # For each coordinate in the available assignments
+            for coordinate in value:
+
+                # Make a deepcopy of the current assignment so we can edit it
+                assignment_copy = copy.deepcopy(assignment)
+                # Simulate what the assignment would look like if we assigned the current value to the region
+                simulated_assignment = self.updateAssignment(assignment_copy, unassigned_variable, coordinate)
+
+                # Increment the available options counter for each option in the simulation
+                for new_key, new_value in simulated_assignment.items():
+                    available_options_counter += len(new_value)
+
+            # If the current variable has the least number of available values remaining
+            if available_options_counter < available_options:
+                # Update the minimum number of options
+                available_options = available_options_counter
+                # Update the most constraining variable
+                most_constraining = unassigned_variable
+
+        return most_constraining
+
+    # Check if the CSP is arc consistent under the current assignment
+    def arcConsistency(self, current_assignment):
+
+        # Make a deepcopy of the current assignment so we can edit it
+        assignment = copy.deepcopy(current_assignment)
+
+        # Initialize a queue of arcs
+        arcs = []
+
+        # For each variable
+        for var1 in self.variables.values():
+            current_constraints = list(self.variables.values())
+            current_constraints.remove(var1)
+
+            # Add an arc between the current variable and every other variable besides itself
+            for var2 in current_constraints:
+                arcs.append((var1, var2))
+
+        # While the arcs queue is not empty
+        while arcs:
+
+            # Remove the first arc
+            arc = arcs.pop()
+            # Store the coordinates of those arcs
+            c1, c2 = arc[0], arc[1]
+
+            # Store boolean as to whether the assignment was revised
+            revised = self.removeInconsistentValues(c1, c2, assignment)[0]
+            # Store the revised assignment
+            assignment = self.removeInconsistentValues(c1, c2, assignment)[1]
+
+            # If the assignment was revised
+            if revised:
+
+                # Return false if there are no more values for the current variable
+                if len(assignment[c1]) == 0:
+                    return False, assignment
+
+        return True, assignment
+
+    # Helper function for the arc consistency method
+    def removeInconsistentValues(self, x1, x2, assignments):
+
+        # Boolean to track whether the current assignment was revised or not
+        revised = False
+        # Store the current arc's coordinates
+        c1, c2 = assignments[x1], assignments[x2]
+        # Make a deepcopy of the assignment so we can edit it
+        domain_copy = copy.deepcopy(assignments)
+
+        # For each value in the first coordinate's domain
+        for v1 in c1:
+
+            # If no value in the second coordinate domains satisfies the constraint
+            if v1 in c2 and len(c2) == 1:
+                # Delete the current coordinate from its domain
+                domain_copy[x1].remove(v1)
+                # Flag that the assignment was revised
+                revised = True
+
+        # Count the revision and the values it removed
+        if revised:
+            self.stats.countRevision(len(c1) - len(domain_copy[x1]))
+
+        return revised, domain_copy
+
+    # HELPER FUNCTIONS
+
+    # Updates the assignment given a new region's assigned location
+    def updateAssignment(self, current_assignment, region, location):
+
+        # With a bitboard, drop every location that falls under the new component's mask
+        if self.bitboard is not None:
+            return self.bitboard.updateAssignment(current_assignment, region, location)
+
+        # Store the coordinates of that region's assignment
+        regional_coordinates = []
+        for x in range(0, region[0]):
+            for y in range(0, region[1]):
+                regional_coordinates.append((location[0] + x, location[1] + y))
+
+        # Make a deepcopy of the assignment so we can edit it
+        updated_assignment = copy.deepcopy(current_assignment)
+
+        # Remove the coordinates of that region's assignment from the domains of the other variables
+        for key, value in updated_assignment.items():
+            for coord in regional_coordinates:
+                if coord in value:
+                    updated_assignment[key].remove(coord)
+
+        updated_assignment[region] = [location]
+
+        return updated_assignment
+
+    # Get all the positions on circuit board
+    def getBoard(self):
+
+        # With a bitboard, the board positions are computed once up front
+        if self.bitboard is not None:
+            return list(self.bitboard.board)
+
+        width = self.constraints[0]
+        height = self.constraints[1]
+
+        spaces = []
+
+        for x in range(0, width):
+            for y in range(0, height):
+                spaces.append((x, y))
+
+        return spaces
+
+    # Check if an assignment keeps its component within the board
+    def within_board(self, location, region):
+
+        width, height = self.constraints[0], self.constraints[1]
+
+        bx, by = location[0], location[1]
+        rx, ry = region[0], region[1]
+
+        if bx + rx <= width and by + ry <= height:
+            return True
+        else:
+            return False
+
+    # Get the variables that have already been assigned
+    def getAssignedVariables(self, assignment):
+
+        assigned = {}
+
+        for part, place in assignment.items():
+            if len(place) == 1:
+                assigned[part] = place
+
+        return assigned
+
+    # Get the variables that have no yet been assigned
+    def getUnassignedVariables(self, assignment):
+        variables = []
+
+        for key, value in assignment.items():
+            if len(value) > 1:
+                variables.append(key)
+
+        return variables
+
+    # Get the spaces on the board that have not yet been assigned
+    def getAvailableSpaces(self, assignment):
+
+        assigned = self.getAssignedVariables(assignment)
+
+        # With a bitboard, read the free spaces off the complement of the occupancy mask
+        if self.bitboard is not None:
+            return self.bitboard.freeSpaces(self.bitboard.occupancy(assigned))
+
+        spaces = self.getBoard()
+
+        for part, place in assigned.items():
+            regional_coordinates = []
+            board_x, board_y = place[0][0], place[0][1]
+
+            for x in range(0, part[0]):
+                for y in range(0, part[1]):
+                    regional_coordinates.append((board_x + x, board_y + y))
+
+            for coord in regional_coordinates:
+                if coord in spaces:
+                    spaces.remove(coord)
+
+        return spaces
+
+    # Get the initial domains of each variable at the beggining of the CSP
+    def getAssignment(self):
+
+        assignment = {}
+
+        for component in self.variables.values():
+
+            domains = []
+            for space in self.getBoard():
+                if self.within_board(component, space):
+                    domains.append(space)
+
+            assignment[component] = domains
+        print(assignment)
+        return assignment
+
+    # Output the final assignments in ASCII
+    def toASCII(self, output, variables, constraints):
+
+        # Import numpy on first use so importing the solver stays fast
+        import numpy
+
+        indexed = {}
+        for key, value in output.items():
+
+            # Keys are either component names or component dimensions
+            if key in self.variables:
+                indexed[key] = value
+                continue
+
+            for k in self.variables.keys():
+                if self.variables[k] == key:
+                    indexed[k] = value
+
+        formatted = numpy.full((constraints[1], constraints[0]), '•')
+        for key, value in indexed.items():
+            dimensions = variables[key]
+            for x in range(0, dimensions[0]):
+                for y in range(0, dimensions[1]):
+                    formatted[y + value[0][1], x + value[0][0]] = key
+
+        print(numpy.array2string(formatted, separator='', formatter={'str_kind': lambda formatted: formatted}))
+
+# Wrap an integer bitmask representation of the circuit board
+class Bitboard:
+
+    def __init__(self, width, height, components):
+
+        # Board dimensions
+        self.width = width
+        self.height = height
+        # Mask with a bit set for every cell on the board
+        self.full = (1 << (width * height)) - 1
+        # Board positions in the same order as CSP.getBoard
+        self.board = [(x, y) for x in range(0, width) for y in range(0, height)]
+        # Bit index of each board position
+        self.bits = [self.bit(space) for space in self.board]
+        # Dictionary of component -> {location: placement mask} for every location on the board
+        self.masks = {}
+        # Cells a shift left or right must not wrap into: the first and last column of every row
+        first = sum(1 << (y * width) for y in range(0, height))
+        self.first_column = first
+        self.last_column = first << (width - 1) if width else 0
+
+        # Precompute the mask of every placement of every component
+        for component in components:
+            self.addComponent(component)
+
+    # Precompute the placement masks of a component shape unless it has been seen already
+    def addComponent(self, component):
+
+        if component not in self.masks:
+            self.masks[component] = self.placements(component)
+
+    # Get the bit index of a board position
+    def bit(self, space):
+
+        return space[1] * self.width + space[0]
+
+    # Get the mask of a w x h rectangle anchored at a location, clipped to the board
+    def rectangle(self, region, location):
+
+        # Clip the rectangle to the board
+        x0, y0 = max(location[0], 0), max(location[1], 0)
+        x1, y1 = min(location[0] + region[0], self.width), min(location[1] + region[1], self.height)
+
+        # Return an empty mask if nothing is left on the board
+        if x0 >= x1 or y0 >= y1:
+            return 0
+
+        # Shift one row of the rectangle into each covered board row
+        row = ((1 << (x1 - x0)) - 1) << x0
+        mask = 0
+        for y in range(y0, y1):
+            mask |= row << (y * self.width)
+
+        return mask
+
+    # Get the masks of every location that keeps a component on the board
+    def placements(self, component):
+
+        placements = {}
+
+        for space in self.board:
+            if space[0] + component[0] <= self.width and space[1] + component[1] <= self.height:
+                placements[space] = self.rectangle(component, space)
+
+        return placements
+
+    # Get the cells orthogonally adjacent to a mask, without wrapping across rows
+    def grow(self, mask):
+
+        return ((mask << 1) & ~self.first_column | (mask >> 1) & ~self.last_column | mask << self.width | mask >> self.width) & self.full
+
+    # Flood fill the free cells connected to a seed mask
+    def flood(self, seed, free):
+
+        region = seed & free
+        while True:
+            grown = (region | self.grow(region)) & free
+            if grown == region:
+                return region
+            region = grown
+
+    # Split free cells into connected pockets as (mask, cell count, width, height) tuples
+    def pockets(self, free):
+
+        pockets = []
+
+        while free:
+            region = self.flood(free & -free, free)
+            free &= ~region
+            pockets.append((region, bin(region).count('1')) + self.extent(region))
+
+        return pockets
+
+    # Get the width and height of the bounding box of a non-empty mask
+    def extent(self, mask):
+
+        width = self.width
+        row = (1 << width) - 1
+
+        # Fold every row onto the first to find the columns in use
+        columns = 0
+        rest = mask
+        while rest:
+            columns |= rest & row
+            rest >>= width
+
+        top = ((mask & -mask).bit_length() - 1) // width
+        bottom = (mask.bit_length() - 1) // width
+
+        return columns.bit_length() - ((columns & -columns).bit_length() - 1), bottom - top + 1
+
+    # Get the mask of a component placed at a location, or None if it falls off the board
+    def placementMask(self, component, location):
+
+        # Use the precomputed mask when we have one
+        if component in self.masks:
+            return self.masks[component].get(location)
+
+        # Otherwise build it on demand
+        if location[0] + component[0] <= self.width and location[1] + component[1] <= self.height:
+            return self.rectangle(component, location)
+
+        return None
+
+    # Get the occupancy mask of the assigned components
+    def occupancy(self, assigned):
+
+        occupied = 0
+
+        for part, place in assigned.items():
+            occupied |= self.rectangle(part, place[0])
+
+        return occupied
+
+    # Check if a component placed at a location stays on the board and avoids the occupied cells
+    def fits(self, component, location, occupied):
+
+        mask = self.placementMask(component, location)
+
+        return mask is not None and not mask & occupied
+
+    # Get the board positions not covered by the occupancy mask
+    def freeSpaces(self, occupied):
+
+        return [space for space, bit in zip(self.board, self.bits) if not (occupied >> bit) & 1]
+
+    # Remove every location covered by a placed component from each domain
+    def updateAssignment(self, current_assignment, region, location):
+
+        # Mask of the cells the component covers
+        mask = self.rectangle(region, location)
+
+        # Build fresh domain lists so the current assignment is left untouched
+        updated_assignment = {}
+        for key, value in current_assignment.items():
+            updated_assignment[key] = [coord for coord in value if not (mask >> self.bit(coord)) & 1]
+
+        updated_assignment[region] = [location]
+
+        return updated_assignment
+
+    # Remove every placement that overlaps the occupancy mask from a component's domain
+    def filterDomain(self, component, domain, occupied):
+
+        masks = self.masks[component]
+
+        return [location for location in domain if not masks[location] & occupied]
+
+# Wrap a set of domains whose changes are recorded on a trail so they can be undone on backtrack
+class DomainStore:
+
+    def __init__(self, domains):
+
+        # Values of each domain; the live values are the first size entries
+        self.values = [list(domain) for domain in domains]
+        # Index of each value within its domain list
+        self.positions = [{value: index for index, value in enumerate(domain)} for domain in self.values]
+        # Number of live values in each domain
+        self.sizes = [len(domain) for domain in self.values]
+        # Stack of (variable, previous size) pairs, one per domain change
+        self.trail = []
+
+    # Get the number of live values of a variable
+    def size(self, variable):
+
+        return self.sizes[variable]
+
+    # Get a snapshot of the live values of a variable
+    def domain(self, variable):
+
+        return self.values[variable][:self.sizes[variable]]
+
+    # Check if a value is still in a variable's domain
+    def contains(self, variable, value):
+
+        return self.positions[variable][value] < self.sizes[variable]
+
+    # Remove a value from a variable's domain by swapping it past the live values
+    def remove(self, variable, value):
+
+        values, positions = self.values[variable], self.positions[variable]
+        size = self.sizes[variable]
+        index = positions[value]
+
+        # Nothing to do if the value has already been removed
+        if index >= size:
+            return
+
+        # Swap the value with the last live value
+        last = values[size - 1]
+        values[index], values[size - 1] = last, value
+        positions[last], positions[value] = index, size - 1
+
+        # Record the old size and shrink the domain
+        self.trail.append((variable, size))
+        self.sizes[variable] = size - 1
+
+    # Reduce a variable's domain to a single value
+    def assign(self, variable, value):
+
+        values, positions = self.values[variable], self.positions[variable]
+        index = positions[value]
+
+        # Swap the value to the front of the domain
+        first = values[0]
+        values[0], values[index] = value, first
+        positions[value], positions[first] = 0, index
+
+        # Record the old size and keep only the front value
+        self.trail.append((variable, self.sizes[variable]))
+        self.sizes[variable] = 1
+
+    # Get a marker for the current state of the trail
+    def mark(self):
+
+        return len(self.trail)
+
+    # Undo every domain change made since a marker
+    def undo(self, mark):
+
+        trail, sizes = self.trail, self.sizes
+
+        while len(trail) > mark:
+            variable, size = trail.pop()
+            sizes[variable] = size
+
+    # Make every domain change so far permanent by forgetting the trail
+    def commit(self):
+
+        self.trail = []
+
+# Wrap a domain store that also keeps a weighted score of each domain and buckets the unplaced variables by size
+class ImpactStore(DomainStore):
+
+    def __init__(self, domains):
+
+        super().__init__(domains)
+
+        # Weight of each value as {value: weight}; 1 counts every value alike, as MRV does
+        self.weights = [dict.fromkeys(domain, 1.0) for domain in self.values]
+        # Sum of the weights of each variable's live values
+        self.scores = [float(size) for size in self.sizes]
+        # Unplaced variables, bucketed by domain size
+        self.buckets = [set() for size in range(max(self.sizes, default=0) + 1)]
+        for variable, size in enumerate(self.sizes):
+            self.buckets[size].add(variable)
+        # Dictionary of placed variable -> trail position of its placement
+        self.placed = {}
+
+    # Remove a value, taking its weight off the score and moving the variable down a bucket
+    def remove(self, variable, value):
+
+        size = self.sizes[variable]
+        super().remove(variable, value)
+
+        if self.sizes[variable] != size:
+            self.scores[variable] -= self.weights[variable][value]
+            if variable not in self.placed:
+                self.buckets[size].discard(variable)
+                self.buckets[size - 1].add(variable)
+
+    # Reduce a variable to a single value and take it out of the buckets
+    def assign(self, variable, value):
+
+        size = self.sizes[variable]
+        super().assign(variable, value)
+
+        self.scores[variable] = self.weights[variable][value]
+        self.buckets[size].discard(variable)
+        self.placed[variable] = len(self.trail) - 1
+
+    # Undo every domain change made since a marker, adding the restored weights back
+    def undo(self, mark):
+
+        trail, sizes, values = self.trail, self.sizes, self.values
+
+        while len(trail) > mark:
+            variable, size = trail.pop()
+            current = sizes[variable]
+            weights = self.weights[variable]
+            self.scores[variable] += sum(weights[value] for value in values[variable][current:size])
+            sizes[variable] = size
+
+            # Put the variable back in the buckets once its placement is undone
+            if variable not in self.placed:
+                self.buckets[current].discard(variable)
+                self.buckets[size].add(variable)
+            elif self.placed[variable] == len(trail):
+                del self.placed[variable]
+                self.buckets[size].add(variable)
+
+    # Change the weight of a value, keeping the score in step if the value is live
+    def setWeight(self, variable, value, weight):
+
+        if self.contains(variable, value):
+            self.scores[variable] += weight - self.weights[variable][value]
+
+        self.weights[variable][value] = weight
+
+    # Get the unplaced variables with the smallest domain
+    def smallest(self):
+
+        for bucket in self.buckets:
+            if bucket:
+                return bucket
+
+        return set()
+
+# Raised to interrupt a search, carrying the unexplored subproblems as placement prefixes
+class SearchInterrupted(Exception):
+
+    def __init__(self, path):
+
+        super().__init__()
+        # The node being entered is unexplored, and each node above adds its untried siblings
+        self.remainder = [list(path)]
+
+# Search state of a parallel worker process
+worker_state = {}
+
+# Give a worker process its own search over the CSP
+def initWorker(variables, domains, constraints, options, stop):
+
+    search = TrailSearch(CSP(variables, domains, constraints), **options)
+    search.stop = stop
+    worker_state['search'] = search
+
+# Solve one subproblem in a worker process, returning (status, payload, stats)
+def solveSubproblem(prefix, budget):
+
+    search = worker_state['search']
+    # Count this subproblem on its own so the parent can sum them
+    search.stats = SearchStats()
+
+    # Skip the work if another worker has already found a solution
+    if search.stop.is_set():
+        return 'stopped', None, search.stats
+
+    return search.solvePrefix(prefix, budget) + (search.stats,)
+
+# Wrap a depth-first search over trailed placement domains for the circuit board problem
+class TrailSearch:
+
+    def __init__(self, csp, variable_order='mrv', value_order='board', propagation='forward', scoring='tensor', backjump=False, symmetry=False, memo=0, capacity=False, restarts=None, seed=0, hook=None):
+
+        # Reuse the CSP's bitboard or build one for the search
+        self.bitboard = csp.bitboard
+        if self.bitboard is None:
+            self.bitboard = Bitboard(csp.constraints[0], csp.constraints[1], csp.variables.values())
+
+        # Component names, indexed by variable number
+        self.names = list(csp.variables.keys())
+        # Component dimensions, indexed by variable number
+        self.dims = [csp.variables[name] for name in self.names]
+        # Placement masks of each variable as {location: mask}
+        self.masks = [self.bitboard.masks[csp.variables[name]] for name in self.names]
+        # Trailed domains of each variable, with cached scores and size buckets for the selectors that use them
+        if variable_order in ('impact', 'mrv-degree'):
+            self.store = ImpactStore([list(masks) for masks in self.masks])
+        else:
+            self.store = DomainStore([list(masks) for masks in self.masks])
+        # Location assigned to each variable, or None while it is unassigned
+        self.assigned = [None] * len(self.names)
+        # Occupancy mask of the assigned components
+        self.occupied = 0
+        # Placements made so far as (variable, location) pairs, in order
+        self.path = []
+        # Counters and heuristic timings of the search
+        self.stats = SearchStats(hook)
+        # Node count at which the search is interrupted, or None to run to completion
+        self.limit = None
+        # Event that interrupts the search once set, or None
+        self.stop = None
+        # Deadline, node budget and cancellation flag of an outcome-returning solve, or None
+        self.cutoff = None
+        # Deepest consistent placements reached, tracked while a cutoff is set
+        self.best = []
+        # Variable ordering: 'mrv', 'degree', 'impact' or 'mrv-degree'
+        self.variable_order = variable_order
+        # Value ordering: 'board' or 'lcv'
+        self.value_order = value_order
+        # Propagation after each placement: 'forward' or 'ac3'
+        self.propagation = propagation
+        # Components whose placements can overlap each other's, indexed by variable
+        self.neighbors = self.getNeighbors()
+        # Last supporting location found for each (variable, location, neighbor) during AC-3
+        self.residues = {}
+        # LCV and degree scoring: 'tensor' for precomputed compatibility matrices or 'simulate'
+        self.scoring = scoring
+        # Compatibility matrices, built only when a heuristic needs them
+        self.tensors = None
+        if scoring == 'tensor' and (variable_order in ('degree', 'impact') or value_order == 'lcv'):
+            self.tensors = CompatibilityTensors(self.dims, self.masks, self.neighbors)
+        # Number of impacts measured for each (variable, location)
+        self.observations = {}
+        # Jump back to the cause of a failure and learn nogoods instead of backtracking chronologically
+        self.backjump = backjump
+        # Learned nogoods indexed by each (variable, location) they contain
+        self.nogoods = {}
+        # Every learned nogood, to skip duplicates
+        self.learned = set()
+        # Largest nogood worth keeping; longer ones rarely recur
+        self.nogood_size = 3
+        # Explanation of the last failed placement: the variable wiped out, or the nogood violated
+        self.wiped = None
+        self.violated = None
+        # Placed components that removed each location, as {location: bitset of variables}, written by
+        # every removal while backjumping; an entry is current for as long as its location stays removed
+        self.reasons = [{} for name in self.names]
+        # Identical components that must take earlier and later locations than each variable
+        self.before = [[] for name in self.names]
+        self.after = [[] for name in self.names]
+        # Components whose placements restrict an identical component's domain
+        self.grouped = []
+        # Proven failures as {canonical state: None} in least recently used order, holding at most memo entries
+        self.memo = memo
+        self.failures = OrderedDict()
+        # Prune nodes whose free pockets can no longer hold the area of the components left to place
+        self.capacity = capacity
+        # Total area of the unassigned components
+        self.remaining = sum(w * h for w, h in self.dims)
+        # Connected pockets of free cells as (mask, cell count, width, height), and the pocket lists they replaced
+        self.pockets = self.bitboard.pockets(self.bitboard.full) if capacity else []
+        self.pocket_trail = []
+        # Restart schedule: None to search once, 'luby' or 'geometric'
+        self.restarts = restarts
+        # Backtracks allowed in the first run of the schedule
+        self.restart_base = 100
+        # Backtrack count at which the current run is abandoned, or None
+        self.restart_limit = None
+        # Seeded random source for breaking ties between runs
+        self.rng = random.Random(seed)
+        # Rank breaking ties between components, lowest first; shuffled at every restart
+        self.rank = list(range(len(self.names)))
+        # Learned weight of each pair of overlapping components as {(variable, other): weight}, kept across restarts; unseen pairs weigh 1
+        self.weights = {}
+        # Break the symmetries of identical components and board reflections
+        self.symmetry = symmetry
+        if symmetry:
+            self.breakSymmetry(csp.constraints)
+        # Estimate the impact of every placement up front from the compatibility matrices
+        if variable_order == 'impact' and self.tensors is not None:
+            self.estimateImpacts()
+
+    # Add ordering constraints between identical components and pin one component to a quarter of the board
+    def breakSymmetry(self, board):
+
+        # Components with the same shape can swap places, so keep them in order of location
+        shapes = {}
+        for variable, dims in enumerate(self.dims):
+            shapes.setdefault(dims, []).append(variable)
+
+        for group in shapes.values():
+            for position, variable in enumerate(group):
+                self.before[variable] = group[:position]
+                self.after[variable] = group[position + 1:]
+            if len(group) > 1:
+                self.grouped.extend(group)
+
+        # Mirroring a layout horizontally or vertically gives another layout, so the largest
+        # component with a shape of its own only needs to start in the top-left quarter.
+        # Without such a component the reflections stay: three 2x2 parts on a 6x4 board keep
+        # 105 of their 630 layouts, while adding a unique 1x1 part cuts 7560 down to 315
+        unique = [group[0] for group in shapes.values() if len(group) == 1]
+        if not unique:
+            return
+
+        anchor = max(unique, key=lambda variable: self.dims[variable][0] * self.dims[variable][1])
+        width, height = board[0], board[1]
+        w, h = self.dims[anchor]
+
+        for location in self.store.domain(anchor):
+            if 2 * location[0] + w > width or 2 * location[1] + h > height:
+                self.store.remove(anchor, location)
+
+        # Keep the restriction when the search is reset
+        self.store.commit()
+
+    # Weight each location by the share of the other components' placements it would leave
+    def estimateImpacts(self):
+
+        unassigned = list(range(len(self.names)))
+
+        for variable in unassigned:
+            locations = self.store.domain(variable)
+            shares = self.tensors.remainingShares(variable, locations, self.store, unassigned, {})
+
+            for location, share in zip(locations, shares):
+                self.store.setWeight(variable, location, float(share))
+
+    # Get the log of the number of combinations left for the unassigned components other than one
+    def searchSpace(self, variable):
+
+        size = self.store.size
+        total = 0.0
+
+        for other in self.getUnassignedVariables():
+            if other != variable:
+                total += math.log(size(other)) if size(other) else -math.inf
+
+        return total
+
+    # Fold the measured impact of a placement into the weight of that location
+    def recordImpact(self, variable, location, before, consistent):
+
+        # A wipeout leaves nothing; otherwise keep the share of the search space that is left
+        share = math.exp(self.searchSpace(variable) - before) if consistent else 0.0
+
+        # Keep a running mean with the estimate counted as the first observation
+        key = (variable, location)
+        seen = self.observations.get(key, 1)
+        self.observations[key] = seen + 1
+        weight = self.store.weights[variable][location]
+        self.store.setWeight(variable, location, weight + (share - weight) / (seen + 1))
+
+    # Run the search and return {component name: [location]} or 'failure'
+    def solve(self):
+
+        # Fail straight away if some component does not fit on the board at all
+        if any(self.store.size(variable) == 0 for variable in range(len(self.names))):
+            return 'failure'
+
+        if self.restarts is not None:
+            return self.solveRestarting()
+
+        # A backjumping search returns a conflict set instead of false when it fails
+        if self.backjump:
+            if self.backjumpSearch() is True:
+                return self.getSolution()
+            return 'failure'
+
+        if self.backtrack():
+            return self.getSolution()
+
+        return 'failure'
+
+    # Run the search on the restart schedule until a run finishes within its backtrack limit
+    #
+    # Learned weights, nogoods and proven failures all stay valid from one run to the next.
+    def solveRestarting(self):
+
+        stats = self.stats
+
+        try:
+            for limit in restartLimits(self.restarts, self.restart_base):
+                self.restart_limit = stats.backtracks + limit
+
+                try:
+                    found = self.backjumpSearch() is True if self.backjump else self.backtrack()
+                    return self.getSolution() if found else 'failure'
+
+                # Start over from an empty board with the ties broken another way
+                except RestartLimit:
+                    self.reset()
+                    stats.restarts += 1
+                    if stats.hook is not None:
+                        stats.hook('restarts', stats)
+                    self.rng.shuffle(self.rank)
+
+        finally:
+            self.restart_limit = None
+
+    # Yield every solution as {component name: [location]}
+    def solutions(self):
+
+        # Yield nothing if some component does not fit on the board at all
+        if any(self.store.size(variable) == 0 for variable in range(len(self.names))):
+            return
+
+        yield from self.enumerate()
+
+    # Yield every complete placement below the current node
+    def enumerate(self):
+
+        # Count the node
+        stats = self.stats
+        stats.nodes += 1
+        if stats.hook is not None:
+            stats.hook('nodes', stats)
+
+        # Choose a component to place
+        start = time.perf_counter()
+        variable = self.selectVariable()
+        stats.time('selectVariable', start)
+
+        # If all components have been placed this is a solution
+        if variable is None:
+            yield self.getSolution()
+            return
+
+        # Skip a state already proven to hold no solution
+        if self.memo:
+            key = self.getState()
+            if self.isKnownFailure(key):
+                return
+
+        start = time.perf_counter()
+        locations = self.orderValues(variable)
+        stats.time('orderValues', start)
+
+        found = False
+
+        for location in locations:
+
+            # Place the component, yield what lies below it, and undo the placement
+            mark = self.store.mark()
+            if self.assign(variable, location):
+                for solution in self.enumerate():
+                    found = True
+                    yield solution
+            self.unassign(variable, location, mark)
+
+        # Count a dead end if nothing below this node was a solution
+        if not found:
+            if self.memo:
+                self.recordFailure(key)
+            stats.backtracks += 1
+            if stats.hook is not None:
+                stats.hook('backtracks', stats)
+
+    # Get a canonical key for the subproblem left at this node
+    #
+    # With forward checking or AC-3 the remaining domains follow from the occupied cells, so
+    # the state is the occupancy plus the shapes still to place. Breaking symmetry ties
+    # components to their identities and identical ones to each other's locations.
+    def getState(self):
+
+        unassigned = self.getUnassignedVariables()
+
+        if not self.symmetry:
+            return self.occupied, tuple(sorted(self.dims[variable] for variable in unassigned))
+
+        placed = tuple(self.assigned[variable] for variable in self.grouped)
+        return self.occupied, frozenset(unassigned), placed
+
+    # Check the transposition table for a state, counting the lookup
+    def isKnownFailure(self, key):
+
+        stats = self.stats
+        stats.lookups += 1
+        if stats.hook is not None:
+            stats.hook('lookups', stats)
+
+        if key not in self.failures:
+            return False
+
+        # Mark the entry as recently used
+        self.failures.move_to_end(key)
+        stats.hits += 1
+        if stats.hook is not None:
+            stats.hook('hits', stats)
+        return True
+
+    # Store a proven failure, evicting the least recently used entry once the table is full
+    #
+    # The statistics count the change in the table rather than its size, since a worker keeps
+    # its table across subproblems that each get fresh statistics for the parent to sum.
+    def recordFailure(self, key):
+
+        stats = self.stats
+
+        if len(self.failures) >= self.memo:
+            evicted, _ = self.failures.popitem(last=False)
+            stats.entries -= 1
+            stats.table_bytes -= self.entrySize(evicted)
+
+        self.failures[key] = None
+        stats.entries += 1
+        stats.table_bytes += self.entrySize(key)
+
+    # Estimate the memory held by one transposition table entry
+    def entrySize(self, key):
+
+        return sys.getsizeof(key) + sum(sys.getsizeof(part) for part in key)
+
+    # Get the deepest placements reached as {component name: [location]}
+    def getPartial(self):
+
+        return {self.names[variable]: [location] for variable, location in self.best}
+
+    # Get the placements of a complete search as {component name: [location]}
+    def getSolution(self):
+
+        return {name: [self.assigned[variable]] for variable, name in enumerate(self.names)}
+
+    # Clear every placement and domain change so the search can start again
+    def reset(self):
+
+        self.store.undo(0)
+        self.assigned = [None] * len(self.names)
+        self.occupied = 0
+        self.path = []
+        self.remaining = sum(w * h for w, h in self.dims)
+        if self.capacity:
+            self.pockets = self.bitboard.pockets(self.bitboard.full)
+            self.pocket_trail = []
+
+    # Search below a prefix of placements for at most budget nodes
+    #
+    # Under restarts each run starts again from the prefix, and the node budget covers all of them.
+    def solvePrefix(self, prefix, budget):
+
+        stats = self.stats
+        limits = restartLimits(self.restarts, self.restart_base) if self.restarts is not None else [None]
+        self.limit = stats.nodes + budget
+
+        try:
+            for limit in limits:
+                self.reset()
+
+                # Replay the prefix, giving up on it if a placement is no longer possible
+                for variable, location in prefix:
+                    if not self.store.contains(variable, location) or not self.assign(variable, location):
+                        return 'failed', None
+
+                self.restart_limit = None if limit is None else stats.backtracks + limit
+
+                try:
+                    if self.backtrack():
+                        return 'solved', self.getSolution()
+                    return 'failed', None
+
+                # Start the subproblem over with the ties broken another way
+                except RestartLimit:
+                    stats.restarts += 1
+                    if stats.hook is not None:
+                        stats.hook('restarts', stats)
+                    self.rng.shuffle(self.rank)
+
+        # Hand back the parts of the subtree we did not get to
+        except SearchInterrupted as interrupt:
+            return 'split', interrupt.remainder
+
+        finally:
+            self.limit = None
+            self.restart_limit = None
+
+    # Backtrack over the trailed domains
+    def backtrack(self):
+
+        # Count the node and stop if we are out of budget or have been cancelled
+        stats = self.stats
+        stats.nodes += 1
+        if stats.hook is not None:
+            stats.hook('nodes', stats)
+        if self.limit is not None and stats.nodes > self.limit:
+            raise SearchInterrupted(self.path)
+        if self.stop is not None and not stats.nodes & 255 and self.stop.is_set():
+            raise SearchInterrupted(self.path)
+
+        # Note the deepest placements so far and give up once the cutoff is reached
+        if self.cutoff is not None:
+            if len(self.path) > len(self.best):
+                self.best = list(self.path)
+            self.cutoff.check(stats)
+
+        # Choose a component to place
+        start = time.perf_counter()
+        variable = self.selectVariable()
+        stats.time('selectVariable', start)
+
+        # If all components have been placed we are done
+        if variable is None:
+            return True
+
+        # Give up straight away on a state already proven to fail
+        if self.memo:
+            key = self.getState()
+            if self.isKnownFailure(key):
+                return False
+
+        # Number of placements above this node
+        depth = len(self.path)
+        start = time.perf_counter()
+        locations = self.orderValues(variable)
+        stats.time('orderValues', start)
+
+        # Try each of its locations in order
+        for position, location in enumerate(locations):
+
+            # Remember the trail so the placement can be undone
+            mark = self.store.mark()
+
+            # Place the component and recurse if no domain was wiped out
+            try:
+                if self.assign(variable, location):
+                    if self.backtrack():
+                        return True
+
+                # Under restarts, learn which pair of components the wipeout came from
+                elif self.restarts is not None:
+                    self.bumpWeight(variable)
+
+            # On an interrupt, record the locations this node has not tried yet as subproblems
+            except SearchInterrupted as interrupt:
+                for untried in locations[position + 1:]:
+                    interrupt.remainder.append(self.path[:depth] + [(variable, untried)])
+                raise
+
+            # Otherwise undo the placement and its domain changes
+            self.unassign(variable, location, mark)
+
+        # Remember the failure for other orders of placement that reach the same state
+        if self.memo:
+            self.recordFailure(key)
+
+        # Count the dead end
+        stats.backtracks += 1
+        if stats.hook is not None:
+            stats.hook('backtracks', stats)
+
+        # Abandon this run once it has spent its backtrack limit
+        if self.restart_limit is not None and stats.backtracks >= self.restart_limit:
+            raise RestartLimit()
+
+        return False
+
+    # Add one to the weight of the pair behind the wipeout a placement just caused
+    def bumpWeight(self, variable):
+
+        other = self.wiped
+        if self.violated is None and other is not None and other != variable:
+            key = (variable, other) if variable < other else (other, variable)
+            self.weights[key] = self.weights.get(key, 1) + 1
+
+    # Sum the learned weights of a component's pairs with the unassigned components it can overlap (wdeg)
+    def weightedDegree(self, variable):
+
+        weights, assigned = self.weights, self.assigned
+        total = 0
+
+        for other in self.neighbors[variable]:
+            if assigned[other] is None:
+                total += weights.get((variable, other) if variable < other else (other, variable), 1)
+
+        return total
+
+    # Search with conflict-directed backjumping, returning True or the set of placed components that caused the failure
+    def backjumpSearch(self):
+
+        # Count the node
+        stats = self.stats
+        stats.nodes += 1
+        if stats.hook is not None:
+            stats.hook('nodes', stats)
+
+        # Note the deepest placements so far and give up once the cutoff is reached
+        if self.cutoff is not None:
+            if len(self.path) > len(self.best):
+                self.best = list(self.path)
+            self.cutoff.check(stats)
+
+        # Choose a component to place
+        start = time.perf_counter()
+        variable = self.selectVariable()
+        stats.time('selectVariable', start)
+
+        # If all components have been placed we are done
+        if variable is None:
+            return True
+
+        start = time.perf_counter()
+        locations = self.orderValues(variable)
+        stats.time('orderValues', start)
+
+        # Still try the locations value ordering dropped as wipeouts, so their failures get a precise explanation
+        ordered = set(locations)
+        locations = locations + [location for location in self.store.domain(variable) if location not in ordered]
+
+        # Placed components that together rule out every location of this one
+        conflict = set()
+
+        for location in locations:
+
+            mark = self.store.mark()
+
+            if self.assign(variable, location):
+                result = self.backjumpSearch()
+
+                if result is True:
+                    return True
+
+                # Jump straight past this component if it played no part in the failure below
+                if variable not in result:
+                    self.unassign(variable, location, mark)
+                    stats.backjumps += 1
+                    if stats.hook is not None:
+                        stats.hook('backjumps', stats)
+                    return result
+
+                conflict |= result
+
+            # Blame whatever made the placement fail straight away
+            else:
+                conflict |= self.explainFailure()
+                if self.restarts is not None:
+                    self.bumpWeight(variable)
+
+            self.unassign(variable, location, mark)
+
+        # Blame the placed components that pruned the other locations before this node
+        tried = set(locations)
+        conflict.discard(variable)
+        conflict |= self.explain(variable, [location for location in self.masks[variable] if location not in tried])
+
+        # The placements in the conflict set cannot coexist
+        self.learn(conflict)
+
+        stats.backtracks += 1
+        if stats.hook is not None:
+            stats.hook('backtracks', stats)
+
+        # Abandon this run once it has spent its backtrack limit
+        if self.restart_limit is not None and stats.backtracks >= self.restart_limit:
+            raise RestartLimit()
+
+        return conflict
+
+    # Get the placed components that removed some locations of a variable
+    def explain(self, variable, locations):
+
+        reasons = self.reasons[variable]
+        removers = 0
+        for location in locations:
+            removers |= reasons.get(location, 0)
+
+        return {other for other, location in self.path if removers >> other & 1}
+
+    # Get the placed components behind the last placement that failed
+    def explainFailure(self):
+
+        if self.violated is not None:
+            return {other for other, location in self.violated}
+
+        # Every location of the wiped out variable has been removed
+        return self.explain(self.wiped, self.masks[self.wiped])
+
+    # Record the current placements of a conflict set as a nogood
+    def learn(self, conflict):
+
+        if len(conflict) > self.nogood_size:
+            return
+
+        nogood = frozenset((variable, self.assigned[variable]) for variable in conflict)
+        if nogood in self.learned:
+            return
+
+        self.learned.add(nogood)
+        for placement in nogood:
+            self.nogoods.setdefault(placement, []).append(nogood)
+
+        stats = self.stats
+        stats.nogoods += 1
+        if stats.hook is not None:
+            stats.hook('nogoods', stats)
+
+    # Check the nogoods a new placement takes part in, returning false if one is violated or wipes out a domain
+    def checkNogoods(self, variable, location):
+
+        assigned, store = self.assigned, self.store
+
+        for nogood in self.nogoods.get((variable, location), ()):
+
+            # Find the one placement of the nogood not yet made, giving up once there are two
+            missing = None
+            for placement in nogood:
+                if assigned[placement[0]] != placement[1]:
+                    if missing is not None:
+                        break
+                    missing = placement
+
+            else:
+                # Every placement of the nogood has been made
+                if missing is None:
+                    self.violated = nogood
+                    return False
+
+                # Rule out the last placement of a nogood that is one placement short, because of the others
+                other, spot = missing
+                if assigned[other] is None and store.contains(other, spot):
+                    store.remove(other, spot)
+                    if self.backjump:
+                        self.reasons[other][spot] = sum(1 << placed for placed, location in nogood if placed != other)
+
+                    stats = self.stats
+                    stats.pruned += 1
+                    if stats.hook is not None:
+                        stats.hook('pruned', stats)
+
+                    if store.size(other) == 0:
+                        self.wiped = other
+                        return False
+
+        return True
+
+    # Place a component and remove overlapping placements from the other domains
+    def assign(self, variable, location):
+
+        mask = self.masks[variable][location]
+        self.assigned[variable] = location
+        self.occupied |= mask
+        self.path.append((variable, location))
+        self.store.assign(variable, location)
+        w, h = self.dims[variable]
+        self.remaining -= w * h
+
+        # Measure the search space before propagating if we are learning impacts
+        if self.variable_order == 'impact':
+            before = self.searchSpace(variable)
+
+        # Propagate the placement through the arcs it touches
+        self.violated = None
+        if self.propagation == 'ac3':
+            consistent = self.propagate(variable)
+        else:
+            consistent = self.forwardCheck(variable, mask)
+
+        if self.variable_order == 'impact':
+            self.recordImpact(variable, location, before, consistent)
+
+        # Then through the ordering of identical components
+        if consistent and self.symmetry:
+            consistent = self.orderIdentical(variable, location)
+
+        # Then through the learned nogoods
+        if consistent and self.nogoods:
+            consistent = self.checkNogoods(variable, location)
+
+        # Then through the free area left for the remaining components
+        if self.capacity:
+            self.splitPockets(mask)
+            if consistent and not self.hasCapacity():
+                self.violated = list(self.path)
+                consistent = False
+
+        return consistent
+
+    # Split the pockets a placement lands in, saving the old list for unassign
+    def splitPockets(self, mask):
+
+        self.pocket_trail.append(self.pockets)
+
+        # Only the pockets under the new placement change; the rest of the board is untouched
+        kept, touched = [], 0
+        for pocket in self.pockets:
+            if pocket[0] & mask:
+                touched |= pocket[0]
+            else:
+                kept.append(pocket)
+
+        self.pockets = kept + self.bitboard.pockets(touched & ~mask)
+
+    # Check that the pockets some remaining component fits in hold at least the remaining area
+    def hasCapacity(self):
+
+        # Shapes left to place, each with its area
+        shapes = {self.dims[variable] for variable in self.getUnassignedVariables()}
+        shapes = [(w, h, w * h) for w, h in shapes]
+
+        # A pocket too small, narrow or short for every remaining shape is dead space
+        usable = 0
+        for mask, cells, width, height in self.pockets:
+            for w, h, area in shapes:
+                if w <= width and h <= height and area <= cells:
+                    usable += cells
+                    break
+
+        return usable >= self.remaining
+
+    # Keep identical components in order of location, returning false if a domain empties
+    def orderIdentical(self, variable, location):
+
+        store, assigned = self.store, self.assigned
+
+        # Earlier components must take smaller locations
+        for other in self.before[variable]:
+            if assigned[other] is None and not self.removeLocations(other, [spot for spot in store.domain(other) if spot >= location], variable):
+                return False
+
+        # And later components larger ones
+        for other in self.after[variable]:
+            if assigned[other] is None and not self.removeLocations(other, [spot for spot in store.domain(other) if spot <= location], variable):
+                return False
+
+        return True
+
+    # Remove some locations from a variable's domain because of a placed component, returning false if it empties
+    def removeLocations(self, variable, locations, cause):
+
+        store = self.store
+
+        for location in locations:
+            store.remove(variable, location)
+            if self.backjump:
+                self.reasons[variable][location] = 1 << cause
+
+        if locations:
+            stats = self.stats
+            stats.pruned += len(locations)
+            if stats.hook is not None:
+                stats.hook('pruned', stats)
+
+        if store.size(variable) == 0:
+            self.wiped = variable
+            return False
+
+        return True
+
+    # Remove a component and restore the domains to a trail marker
+    def unassign(self, variable, location, mark):
+
+        self.occupied &= ~self.masks[variable][location]
+        self.assigned[variable] = None
+        self.path.pop()
+        self.store.undo(mark)
+        w, h = self.dims[variable]
+        self.remaining += w * h
+        if self.capacity:
+            self.pockets = self.pocket_trail.pop()
+
+    # Remove placements that overlap a newly placed mask, returning false if a domain empties
+    def forwardCheck(self, variable, mask):
+
+        store = self.store
+        # Locations tested and removed, counted once at the end
+        checks = pruned = 0
+        consistent = True
+        # The placement alone is the reason for every removal, noted while backjumping
+        reason = 1 << variable if self.backjump else 0
+
+        for other in self.getUnassignedVariables():
+            masks = self.masks[other]
+            domain = store.domain(other)
+
+            for location in domain:
+                if masks[location] & mask:
+                    store.remove(other, location)
+                    if reason:
+                        self.reasons[other][location] = reason
+
+            checks += len(domain)
+            pruned += len(domain) - store.size(other)
+
+            if store.size(other) == 0:
+                self.wiped = other
+                consistent = False
+                break
+
+        stats = self.stats
+        stats.checks += checks
+        stats.pruned += pruned
+        if stats.hook is not None:
+            stats.hook('checks', stats)
+            stats.hook('pruned', stats)
+
+        return consistent
+
+    # Run AC-3 from the arcs pointing at a changed variable, returning false if a domain empties
+    def propagate(self, changed):
+
+        store, neighbors = self.store, self.neighbors
+
+        # Queue only the arcs whose support may have been lost
+        queue = deque((other, changed) for other in neighbors[changed])
+        queued = set(queue)
+        # Cover masks of each variable as (domain size, compulsory, union), reused until the domain shrinks
+        covers = {}
+
+        # While the arcs queue is not empty
+        while queue:
+
+            arc = queue.popleft()
+            queued.discard(arc)
+            x1, x2 = arc
+
+            # If the first variable lost values, its own neighbors need to be checked again
+            if self.revise(x1, x2, covers):
+
+                # Return false if there are no more values for the current variable
+                if store.size(x1) == 0:
+                    self.wiped = x1
+                    return False
+
+                for neighbor in neighbors[x1]:
+                    if neighbor != x2 and (neighbor, x1) not in queued:
+                        queue.append((neighbor, x1))
+                        queued.add((neighbor, x1))
+
+        return True
+
+    # Remove the locations of x1 that overlap every remaining location of x2
+    def revise(self, x1, x2, covers):
+
+        store, residues = self.store, self.residues
+        masks1, masks2 = self.masks[x1], self.masks[x2]
+        domain2 = store.domain(x2)
+
+        # Cells covered by every location of x2, and by any location of x2
+        cover = covers.get(x2)
+        if cover is None or cover[0] != len(domain2):
+            cover = (len(domain2),) + self.getCover(x2)
+            covers[x2] = cover
+        compulsory, union = cover[1], cover[2]
+
+        revised = False
+        domain1 = store.domain(x1)
+
+        for location in domain1:
+            mask = masks1[location]
+
+            # Supported if it cannot touch x2 at all
+            if not mask & union:
+                continue
+
+            # Unsupported if it overlaps cells x2 is certain to cover, such as those of a placed component
+            if mask & compulsory:
+                store.remove(x1, location)
+                if self.backjump:
+                    self.reasons[x1][location] = self.supportReason(mask, x2)
+                revised = True
+                continue
+
+            # Supported if the last support we found is still live
+            residue = residues.get((x1, location, x2))
+            if residue is not None and store.contains(x2, residue) and not mask & masks2[residue]:
+                continue
+
+            # Otherwise look for a new support
+            for support in domain2:
+                if not mask & masks2[support]:
+                    residues[(x1, location, x2)] = support
+                    break
+            else:
+                store.remove(x1, location)
+                if self.backjump:
+                    self.reasons[x1][location] = self.supportReason(mask, x2)
+                revised = True
+
+        # Count the locations tested, and the revision if it removed any
+        stats = self.stats
+        stats.checks += len(domain1)
+        if stats.hook is not None:
+            stats.hook('checks', stats)
+        if revised:
+            stats.countRevision(len(domain1) - store.size(x1))
+
+        return revised
+
+    # Get the placed components that removed every location of x2 compatible with a mask, as a bitset
+    def supportReason(self, mask, x2):
+
+        # A placed component rules the mask out by itself
+        if self.assigned[x2] is not None:
+            return 1 << x2
+
+        # Otherwise the mask lost its supports when they were removed
+        masks2, reasons2 = self.masks[x2], self.reasons[x2]
+        reason = 0
+        for support, other in masks2.items():
+            if not mask & other:
+                reason |= reasons2.get(support, 0)
+
+        return reason
+
+    # Get the cells covered by every remaining location of a variable, and by any of them
+    def getCover(self, variable):
+
+        masks = self.masks[variable]
+        compulsory, union = self.bitboard.full, 0
+
+        for location in self.store.domain(variable):
+            compulsory &= masks[location]
+            union |= masks[location]
+
+        return compulsory, union
+
+    # Get the components whose placements can overlap, indexed by variable
+    def getNeighbors(self):
+
+        # Cells reachable by any placement of each component
+        reach = []
+        for masks in self.masks:
+            union = 0
+            for mask in masks.values():
+                union |= mask
+            reach.append(union)
+
+        return [[other for other in range(len(reach)) if other != variable and reach[variable] & reach[other]] for variable in range(len(reach))]
+
+    # Get the variables that have not yet been placed
+    def getUnassignedVariables(self):
+
+        return [variable for variable, location in enumerate(self.assigned) if location is None]
+
+    # Choose the next component to place
+    def selectVariable(self):
+
+        # Take the smallest domains from the size buckets and break ties by degree
+        if self.variable_order == 'mrv-degree':
+            bucket = self.store.smallest()
+            if not bucket:
+                return None
+            return max(bucket, key=lambda variable: (len(self.neighbors[variable]), -self.rank[variable]))
+
+        unassigned = self.getUnassignedVariables()
+
+        # Return None once every component is placed
+        if not unassigned:
+            return None
+
+        # Under restarts, visit the components in rank order so ties fall differently on each run
+        if self.restarts is not None:
+            unassigned.sort(key=self.rank.__getitem__)
+
+        # Pick the component whose placements leave the fewest options overall
+        if self.variable_order == 'degree' and len(unassigned) > 1:
+
+            # Score every component against the same live domains
+            if self.tensors is not None:
+                live = {}
+                return min(unassigned, key=lambda variable: self.tensors.degreeScore(variable, self.store, unassigned, live))
+
+            return min(unassigned, key=self.degreeScore)
+
+        # Pick the component whose locations leave the least search space, from the cached scores
+        if self.variable_order == 'impact':
+            scores = self.store.scores
+            return min(unassigned, key=lambda variable: (scores[variable], -len(self.neighbors[variable])))
+
+        # Under restarts, divide each domain size by the learned weight of the component (dom/wdeg)
+        if self.restarts is not None:
+            return min(unassigned, key=lambda variable: self.store.size(variable) / max(self.weightedDegree(variable), 1))
+
+        # Otherwise pick the component with the fewest remaining locations
+        return min(unassigned, key=self.store.size)
+
+    # Order a component's locations for the search
+    def orderValues(self, variable):
+
+        locations = sorted(self.store.domain(variable))
+
+        # Try the locations that leave the most options for the others first
+        if self.value_order == 'lcv' and len(locations) > 1:
+
+            # Under restarts, shuffle first so the stable sort breaks ties differently on each run
+            if self.restarts is not None:
+                self.rng.shuffle(locations)
+
+            # Read the scores off the compatibility matrices when we have them
+            if self.tensors is not None:
+                scores = self.tensors.valueScores(variable, locations, self.store, self.getUnassignedVariables(), {})
+            else:
+                scores = {location: self.simulate(variable, location) for location in locations}
+
+            return sorted([location for location in locations if scores[location] is not None], key=scores.get, reverse=True)
+
+        return locations
+
+    # Count the options left for the other components if a component were placed, or None on a wipeout
+    def simulate(self, variable, location):
+
+        mark = self.store.mark()
+        consistent = self.assign(variable, location)
+        remaining = sum(self.store.size(other) for other in self.getUnassignedVariables())
+        self.unassign(variable, location, mark)
+
+        return remaining if consistent else None
+
+    # Sum the options left for the other components over each location of a component
+    def degreeScore(self, variable):
+
+        score = 0
+
+        for location in self.store.domain(variable):
+            remaining = self.simulate(variable, location)
+            if remaining is not None:
+                score += remaining
+
+        return score
+
+# Wrap precomputed boolean compatibility matrices between the placement sets of each pair of components
+class CompatibilityTensors:
+
+    def __init__(self, dims, masks, neighbors):
+
+        # Import numpy on first use so importing the solver stays fast
+        import numpy
+
+        # Sorted locations of each variable, and the row of each location in that variable's matrices
+        self.locations = [sorted(placements) for placements in masks]
+        self.rows = [{location: row for row, location in enumerate(locations)} for locations in self.locations]
+        # Dictionary of (variable, other) -> matrix whose [a, b] entry is true if placements a and b do not overlap
+        self.matrices = {}
+        # Overlapping pairs whose matrix would exceed TENSOR_LIMIT entries, tested against the live placements instead
+        self.oversized = set()
+        # Component dimensions, indexed by variable
+        self.dims = dims
+
+        # Anchor coordinates of each variable's placements as vectors
+        self.xs = [numpy.array([location[0] for location in locations], dtype=numpy.int32) for locations in self.locations]
+        self.ys = [numpy.array([location[1] for location in locations], dtype=numpy.int32) for locations in self.locations]
+
+        # Build each matrix once for the pairs whose placements can overlap; the reverse pair is its transpose
+        for variable, others in enumerate(neighbors):
+            for other in others:
+                if other < variable:
+                    continue
+
+                if len(self.locations[variable]) * len(self.locations[other]) > TENSOR_LIMIT:
+                    self.oversized.add((variable, other))
+                    self.oversized.add((other, variable))
+                    continue
+
+                compatible = self.compatible(variable, self.xs[variable], self.ys[variable], other, self.xs[other], self.ys[other])
+
+                self.matrices[(variable, other)] = compatible
+                self.matrices[(other, variable)] = compatible.T
+
+    # Get the matrix of which placements of a variable, by anchor coordinates, leave those of another free
+    def compatible(self, variable, x1, y1, other, x2, y2):
+
+        (w1, h1), (w2, h2) = self.dims[variable], self.dims[other]
+        x1, y1 = x1[:, None], y1[:, None]
+        x2, y2 = x2[None, :], y2[None, :]
+
+        # Two rectangles are compatible if one lies entirely to one side of the other
+        return (x2 >= x1 + w1) | (x2 + w2 <= x1) | (y2 >= y1 + h1) | (y2 + h2 <= y1)
+
+    # Count the live placements of another variable compatible with each given row, a block of rows at a time
+    def simulate(self, variable, rows, other, store):
+
+        import numpy
+
+        live = sorted(store.domain(other))
+        counts = numpy.zeros(len(rows), dtype=numpy.int64)
+        if not live:
+            return counts
+
+        x2 = numpy.array([location[0] for location in live], dtype=numpy.int32)
+        y2 = numpy.array([location[1] for location in live], dtype=numpy.int32)
+        x1, y1 = self.xs[variable][rows], self.ys[variable][rows]
+
+        # Keep each block of the matrix within TENSOR_LIMIT entries
+        step = max(TENSOR_LIMIT // len(live), 1)
+        for start in range(0, len(rows), step):
+            block = self.compatible(variable, x1[start:start + step], y1[start:start + step], other, x2, y2)
+            counts[start:start + step] = block.sum(axis=1)
+
+        return counts
+
+    # Get a 0/1 vector over a variable's placements marking those still in its domain
+    def liveVector(self, variable, store, live):
+
+        import numpy
+
+        if variable not in live:
+            vector = numpy.zeros(len(self.locations[variable]), dtype=numpy.int64)
+            rows = self.rows[variable]
+            vector[[rows[location] for location in store.domain(variable)]] = 1
+            live[variable] = vector
+
+        return live[variable]
+
+    # Count the live placements of each other variable compatible with each of a variable's locations
+    def counts(self, variable, locations, store, others, live):
+
+        import numpy
+
+        rows = numpy.array([self.rows[variable][location] for location in locations], dtype=numpy.int64)
+        counts = numpy.empty((len(rows), len(others)), dtype=numpy.int64)
+
+        for column, other in enumerate(others):
+            matrix = self.matrices.get((variable, other))
+
+            # Components that can never overlap leave each other's domains untouched
+            if matrix is None and (variable, other) in self.oversized:
+                counts[:, column] = self.simulate(variable, rows, other, store)
+            elif matrix is None:
+                counts[:, column] = store.size(other)
+            else:
+                counts[:, column] = matrix[rows] @ self.liveVector(other, store, live)
+
+        return counts
+
+    # Score each location by the options it leaves the other unassigned variables, or None on a wipeout
+    def valueScores(self, variable, locations, store, unassigned, live):
+
+        import numpy
+
+        others = [other for other in unassigned if other != variable]
+        counts = self.counts(variable, locations, store, others, live)
+
+        # A location wipes out a domain if it leaves some other variable no compatible placement
+        totals = counts.sum(axis=1)
+        feasible = counts.min(axis=1) > 0 if others else numpy.ones(len(locations), dtype=bool)
+
+        return {location: int(total) if ok else None for location, total, ok in zip(locations, totals, feasible)}
+
+    # Get the share of each other unassigned variable's live placements left by each location, multiplied together
+    def remainingShares(self, variable, locations, store, unassigned, live):
+
+        import numpy
+
+        others = [other for other in unassigned if other != variable]
+        counts = self.counts(variable, locations, store, others, live)
+        sizes = numpy.array([max(store.size(other), 1) for other in others], dtype=numpy.float64)
+
+        return numpy.prod(counts / sizes, axis=1) if others else numpy.ones(len(locations))
+
+    # Sum the options left for the other unassigned variables over each location of a variable
+    def degreeScore(self, variable, store, unassigned, live):
+
+        scores = self.valueScores(variable, store.domain(variable), store, unassigned, live)
+
+        return sum(score for score in scores.values() if score is not None)
+
+# Wrap Knuth's Algorithm X with Dancing Links for the circuit board problem
+#
+# There is a column for every component, which must be covered exactly once, and one
+# for every cell, and a row for every placement of a component. When the components
+# tile the board the cells are primary columns too; otherwise they are secondary
+# columns covered at most once, which is the same as padding with unit blanks.
+class ExactCoverSearch:
+
+    def __init__(self, csp, symmetry=False, hook=None):
+
+        # Reuse the CSP's bitboard or build one for the search
+        bitboard = csp.bitboard
+        if bitboard is None:
+            bitboard = Bitboard(csp.constraints[0], csp.constraints[1], csp.variables.values())
+        width, height = bitboard.width, bitboard.height
+
+        # Component names and dimensions, indexed by variable number
+        self.names = list(csp.variables.keys())
+        self.dims = [csp.variables[name] for name in self.names]
+        # Whether the components cover the whole board, and whether they fit in it at all
+        area = sum(w * h for w, h in self.dims)
+        self.tiling = area == width * height
+        self.fits = area <= width * height
+        # Counters and heuristic timings of the search
+        self.stats = SearchStats(hook)
+
+        # Node 0 is the root and nodes 1..columns are the column headers: components first, then cells
+        components = len(self.names)
+        columns = components + width * height
+        primary = columns if self.tiling else components
+        # Links of every node in the four directions, and the column header of each node
+        self.left = list(range(-1, columns))
+        self.right = list(range(1, columns + 2))
+        self.up = list(range(columns + 1))
+        self.down = list(range(columns + 1))
+        self.column = list(range(columns + 1))
+        # Number of rows left in each column
+        self.sizes = [0] * (columns + 1)
+        # Placement of the row each node belongs to, as (variable, location)
+        self.rows = [None] * (columns + 1)
+
+        # Only the primary columns hang off the root; secondary ones link to themselves
+        self.left[0], self.right[primary] = primary, 0
+        for header in range(primary + 1, columns + 1):
+            self.left[header] = self.right[header] = header
+
+        # Add a row for every placement of every component
+        for variable, (w, h) in enumerate(self.dims):
+            for location in bitboard.masks[(w, h)]:
+                x, y = location
+                cells = [components + 1 + (y + dy) * width + x + dx for dy in range(h) for dx in range(w)]
+                self.addRow([variable + 1] + cells, (variable, location))
+
+        # Placements made so far as (variable, location) pairs, in order
+        self.path = []
+        # Keep identical components in order of location, so each layout is found once rather than once per permutation
+        self.symmetry = symmetry
+        # Other components with the same shape as each variable
+        shapes = {}
+        for variable, dims in enumerate(self.dims):
+            shapes.setdefault(dims, []).append(variable)
+        self.identical = [[other for other in shapes[dims] if other != variable] for variable, dims in enumerate(self.dims)]
+        # Location of each placed variable, or None while it is unplaced
+        self.locations = [None] * components
+        # Deadline, node budget and cancellation flag, or None
+        self.cutoff = None
+
+    # Append a row covering some columns, linking its nodes into a ring
+    def addRow(self, headers, placement):
+
+        first = len(self.column)
+
+        for offset, header in enumerate(headers):
+            node = first + offset
+
+            # Link the node in at the bottom of its column
+            self.column.append(header)
+            self.up.append(self.up[header])
+            self.down.append(header)
+            self.down[self.up[header]] = node
+            self.up[header] = node
+            self.sizes[header] += 1
+
+            # Link it between its neighbors in the row
+            self.left.append(node - 1 if offset else first + len(headers) - 1)
+            self.right.append(node + 1 if offset < len(headers) - 1 else first)
+            self.rows.append(placement)
+
+    # Remove a column from the header list and its rows from the other columns
+    def cover(self, header):
+
+        left, right, up, down, column, sizes = self.left, self.right, self.up, self.down, self.column, self.sizes
+
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+
+        row = down[header]
+        while row != header:
+            node = right[row]
+            while node != row:
+                down[up[node]] = down[node]
+                up[down[node]] = up[node]
+                sizes[column[node]] -= 1
+                node = right[node]
+            row = down[row]
+
+    # Put a covered column and its rows back, in the reverse order of cover
+    def uncover(self, header):
+
+        left, right, up, down, column, sizes = self.left, self.right, self.up, self.down, self.column, self.sizes
+
+        row = up[header]
+        while row != header:
+            node = left[row]
+            while node != row:
+                sizes[column[node]] += 1
+                down[up[node]] = node
+                up[down[node]] = node
+                node = left[node]
+            row = up[row]
+
+        right[left[header]] = header
+        left[right[header]] = header
+
+    # Check that a placement keeps a component after the identical ones before it and before those after it
+    def inOrder(self, variable, location):
+
+        for other in self.identical[variable]:
+            placed = self.locations[other]
+            if placed is not None and (other < variable) != (placed < location):
+                return False
+
+        return True
+
+    # Run the search and return {component name: [location]} or 'failure'
+    def solve(self):
+
+        return next(self.solutions(), 'failure')
+
+    # Yield every solution as {component name: [location]}
+    def solutions(self):
+
+        if self.fits:
+            yield from self.search()
+
+    # Yield every exact cover below the current node
+    def search(self):
+
+        # Count the node
+        stats = self.stats
+        stats.nodes += 1
+        if stats.hook is not None:
+            stats.hook('nodes', stats)
+
+        if self.cutoff is not None:
+            self.cutoff.check(stats)
+
+        right, down, sizes = self.right, self.down, self.sizes
+
+        # Every primary column is covered, so the placements made are a solution
+        if right[0] == 0:
+            yield {self.names[variable]: [location] for variable, location in self.path}
+            return
+
+        # Branch on the primary column with the fewest rows left
+        start = time.perf_counter()
+        header = right[0]
+        best = header
+        while header != 0:
+            if sizes[header] < sizes[best]:
+                best = header
+            header = right[header]
+        stats.time('selectColumn', start)
+
+        stats.checks += sizes[best]
+        if stats.hook is not None:
+            stats.hook('checks', stats)
+
+        found = False
+        self.cover(best)
+
+        # Try each row of the column, covering every other column it fills
+        row = down[best]
+        while row != best:
+
+            # Skip placements that would put identical components out of order
+            variable, location = self.rows[row]
+            if self.symmetry and not self.inOrder(variable, location):
+                row = down[row]
+                continue
+
+            node = right[row]
+            while node != row:
+                self.cover(self.column[node])
+                node = right[node]
+
+            self.path.append(self.rows[row])
+            self.locations[variable] = location
+            for solution in self.search():
+                found = True
+                yield solution
+            self.locations[variable] = None
+            self.path.pop()
+
+            node = self.left[row]
+            while node != row:
+                self.uncover(self.column[node])
+                node = self.left[node]
+
+            row = down[row]
+
+        self.uncover(best)
+
+        # Count a dead end if nothing below this node was a solution
+        if not found:
+            stats.backtracks += 1
+            if stats.hook is not None:
+                stats.hook('backtracks', stats)
+
+# Solve and print the demo problems
+def demo():
+
+    # PROBLEM 1
+
+    # Binary Constraints
+    width = 10
+    height = 3
+
+    # Constraints
+    constraints = (width, height)
+
+    # Variables
+    component_a = (3, 2)
+    component_b = (5, 2)
+    component_c = (2, 3)
+    component_e = (7, 1)
+
+    variables = {'a': component_a, 'b':component_b, 'c':component_c, 'e': component_e}
+
+    # Domains
+    domains = []
+
+    for component in variables.values():
+        x, y = component[0], component[1]
+        w, h = constraints[0], constraints[1]
+        domains.append((w-x, h-y))
+
+    circuit_board_problem = CSP(variables, domains, constraints)
+
+    print('\nPROBLEM 1 CIRCUIT BOARD')
+    print('Size: 10 x 3')
+    print('Number of components: 4\n')
+    output = circuit_board_problem.csp_solver()
+
+    # PROBLEM 2
+
+    # Binary Constraints
+    width = 12
+    height = 5
+
+    # Constraints
+    constraints = (width, height)
+
+    # Variables
+    component_a = (6, 3)
+    component_b = (8, 1)
+    component_c = (3, 4)
+    component_e = (3, 3)
+    component_f = (3, 2)
+    component_g = (5, 1)
+
+    variables = {'a': component_a, 'b':component_b, 'c':component_c, 'e': component_e, 'f': component_f, 'g': component_g}
+
+    # Domains
+    domains = []
+
+    for component in variables.values():
+        x, y = component[0], component[1]
+        w, h = constraints[0], constraints[1]
+        domains.append((w-x, h-y))
+
+    circuit_board_problem = CSP(variables, domains, constraints)
+
+    print('\nPROBLEM 2 CIRCUIT BOARD')
+    print('Size: 12 x 5')
+    print('Number of components: 6\n')
+    output = circuit_board_problem.csp_solver()
+
+if __name__ == '__main__':
+    demo()
@@ -0,0 +1,25 @@
+# Command line entry point that solves and prints the demo problems
+import argparse
+
+# Demo problems by name, as the module holding each
+DEMOS = {'map': 'map_problem', 'board': 'circuit_board'}
+
+# Run the demo problems named on the command line, or all of them
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='Solve the constraint satisfaction demo problems')
+    # Names are checked by hand; argparse before 3.12 rejects an empty list against choices
+    parser.add_argument('problems', nargs='*', metavar='{%s}' % ','.join(DEMOS), help='demos to run (default: all)')
+    args = parser.parse_args(argv)
+
+    for problem in args.problems:
+        if problem not in DEMOS:
+            parser.error('invalid choice: %r (choose from %s)' % (problem, ', '.join(DEMOS)))
+
+    # Import only the solvers that are asked for
+    for problem in args.problems or list(DEMOS):
+        module = __import__('constraint_satisfaction.' + DEMOS[problem], fromlist=['demo'])
+        module.demo()
+
+if __name__ == '__main__':
+    main()
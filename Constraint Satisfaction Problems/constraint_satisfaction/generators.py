@@ -0,0 +1,82 @@
+# Seeded instance generators for the constraint satisfaction solvers
+import random
+import string
+
+# Colors given to generated maps; four always suffice for a planar map
+MAP_COLORS = ['r', 'g', 'b', 'y']
+
+# Single-character component names, so boards can still be printed in ASCII
+COMPONENT_NAMES = string.ascii_lowercase + string.ascii_uppercase + string.digits
+
+# Generate a random planar map as (variables, domains, constraints)
+#
+# The map starts as a random maximal planar graph, grown by dropping each new
+# region into a random triangular face, and tightness is the fraction of its
+# borders that are kept.
+def randomPlanarMap(seed, regions, tightness=1.0, colors=4):
+
+    rng = random.Random(seed)
+    variables = ['r%d' % index for index in range(regions)]
+
+    # Borders as pairs of region indices, and the triangular faces still open for new regions
+    borders = []
+    faces = []
+
+    # Start from a single triangle, or whatever fits in a smaller map
+    for i in range(min(regions, 3)):
+        for j in range(i + 1, min(regions, 3)):
+            borders.append((i, j))
+    if regions >= 3:
+        faces = [(0, 1, 2), (0, 1, 2)]
+
+    # Each new region borders the three corners of the face it lands in, splitting it into three
+    for region in range(3, regions):
+        a, b, c = faces.pop(rng.randrange(len(faces)))
+        borders.extend([(a, region), (b, region), (c, region)])
+        faces.extend([(a, b, region), (b, c, region), (a, c, region)])
+
+    # Keep a random share of the borders
+    kept = [border for border in borders if rng.random() < tightness]
+    constraints = [(variables[a], variables[b]) for a, b in kept]
+
+    return variables, MAP_COLORS[:colors], constraints
+
+# Generate a random circuit board as ((width, height), {component: (w, h)})
+#
+# The board is cut into rectangles by random guillotine cuts, so the full set
+# of components always packs it exactly; tightness is the share of the board
+# the kept components cover, with random components dropped until it is met.
+def randomBoard(seed, width, height, components, tightness=1.0):
+
+    rng = random.Random(seed)
+
+    # Pieces as (x, y, w, h); keep cutting the largest piece that can still be cut
+    pieces = [(0, 0, width, height)]
+    while len(pieces) < min(components, len(COMPONENT_NAMES)):
+
+        cuttable = [piece for piece in pieces if piece[2] > 1 or piece[3] > 1]
+        if not cuttable:
+            break
+
+        piece = max(cuttable, key=lambda piece: piece[2] * piece[3])
+        pieces.remove(piece)
+        x, y, w, h = piece
+
+        # Cut across the longer side at a random point
+        if w >= h:
+            cut = rng.randint(1, w - 1)
+            pieces.extend([(x, y, cut, h), (x + cut, y, w - cut, h)])
+        else:
+            cut = rng.randint(1, h - 1)
+            pieces.extend([(x, y, w, cut), (x, y + cut, w, h - cut)])
+
+    # Drop random pieces until the kept ones cover no more than the tightness
+    rng.shuffle(pieces)
+    area = sum(piece[2] * piece[3] for piece in pieces)
+    while len(pieces) > 1 and area > tightness * width * height:
+        piece = pieces.pop()
+        area -= piece[2] * piece[3]
+
+    variables = {name: (piece[2], piece[3]) for name, piece in zip(COMPONENT_NAMES, pieces)}
+
+    return (width, height), variables
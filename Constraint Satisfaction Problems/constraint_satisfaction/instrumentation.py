@@ -0,0 +1,167 @@
+# Search statistics and cancellation shared by the constraint satisfaction solvers
+import threading
+import time
+
+# Counters updated by the solvers, which are also the names of the events passed to a hook
+EVENTS = ['nodes', 'backtracks', 'checks', 'revisions', 'pruned', 'backjumps', 'nogoods', 'lookups', 'hits', 'restarts']
+
+# Wrap the counters and heuristic timings of one solve
+#
+# The solvers bump the counters inline and only call the hook when one is set,
+# as hook(event, stats) right after the counter named by event has changed.
+class SearchStats:
+
+    def __init__(self, hook=None):
+
+        # Search nodes expanded
+        self.nodes = 0
+        # Nodes that ran out of values
+        self.backtracks = 0
+        # Consistency checks between a value and the rest of the assignment
+        self.checks = 0
+        # Arc revisions that removed at least one value
+        self.revisions = 0
+        # Values removed from domains by propagation
+        self.pruned = 0
+        # Failures that jumped back past at least one component
+        self.backjumps = 0
+        # Nogoods learned from failures
+        self.nogoods = 0
+        # Transposition table lookups, and those that found a proven failure
+        self.lookups = 0
+        self.hits = 0
+        # Runs abandoned by a restarting search once they spent their backtrack limit
+        self.restarts = 0
+        # Entries added to the transposition table less those evicted, and their approximate size in
+        # bytes; summed over the subproblems of a parallel solve, the size of every worker's table
+        self.entries = 0
+        self.table_bytes = 0
+        # Dictionary of heuristic name -> cumulative seconds
+        self.timings = {}
+        # Optional callback for each event
+        self.hook = hook
+
+    # Add the time since a perf_counter start to a heuristic's total
+    def time(self, name, start):
+
+        self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    # Count an arc revision and the values it pruned
+    def countRevision(self, pruned):
+
+        self.revisions += 1
+        self.pruned += pruned
+
+        if self.hook is not None:
+            self.hook('revisions', self)
+            self.hook('pruned', self)
+
+    # Add the counters and timings of another solve, such as one run by a worker process
+    def merge(self, other):
+
+        for event in EVENTS + ['entries', 'table_bytes']:
+            setattr(self, event, getattr(self, event) + getattr(other, event))
+
+        for name, seconds in other.timings.items():
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    # Get the counters and timings as a plain dictionary
+    def asDict(self):
+
+        stats = {event: getattr(self, event) for event in EVENTS}
+        stats['hit_rate'] = self.hits / self.lookups if self.lookups else 0.0
+        stats['entries'] = self.entries
+        stats['table_bytes'] = self.table_bytes
+        stats['timings'] = dict(self.timings)
+
+        return stats
+
+    # Drop the hook when pickling, since callbacks do not cross process boundaries
+    def __getstate__(self):
+
+        state = dict(self.__dict__)
+        state['hook'] = None
+
+        return state
+
+# Raised inside a search once its cutoff is reached, with the reason: 'deadline', 'budget' or 'cancelled'
+class SearchCancelled(Exception):
+
+    def __init__(self, reason):
+
+        super().__init__(reason)
+        self.reason = reason
+
+# Raised inside a restarting search once the current run has spent its backtrack limit
+class RestartLimit(Exception):
+    pass
+
+# Get the ith term of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, ..., counting from 1
+def luby(index):
+
+    while True:
+        # The term closing each block of 2^k - 1 terms is 2^(k - 1); otherwise the block repeats the earlier ones
+        k = index.bit_length()
+        if index == (1 << k) - 1:
+            return 1 << (k - 1)
+        index -= (1 << (k - 1)) - 1
+
+# Yield the backtrack limit of each run of a restarting search: 'luby' or 'geometric' growth from base
+#
+# Both schedules grow without bound, so a restarting search stays complete.
+def restartLimits(schedule='luby', base=100):
+
+    run = 1
+    while True:
+        if schedule == 'luby':
+            yield base * luby(run)
+        else:
+            yield int(base * 1.5 ** (run - 1))
+        run += 1
+
+# Wrap the limits of a cancellable solve: a wall-clock deadline, a node budget and a stop flag
+#
+# The solvers call check once per node, so a search notices a limit within one node
+# of reaching it; the stop flag is how another thread asks it to give up.
+class Cutoff:
+
+    def __init__(self, deadline=None, budget=None):
+
+        # Seconds from now, as a perf_counter time, after which the search gives up
+        self.deadline = None if deadline is None else time.perf_counter() + deadline
+        # Number of nodes after which the search gives up
+        self.budget = budget
+        # Flag set from another thread to cancel the search
+        self.stop = threading.Event()
+
+    # Raise SearchCancelled if a limit has been reached
+    def check(self, stats):
+
+        if self.budget is not None and stats.nodes > self.budget:
+            raise SearchCancelled('budget')
+        if self.stop.is_set():
+            raise SearchCancelled('cancelled')
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchCancelled('deadline')
+
+# Get the outcome of a cancellable solve as a dictionary
+def searchOutcome(status, solution, partial, stats):
+
+    return {'status': status, 'solution': solution, 'partial': partial, 'stats': stats.asDict()}
+
+# Run a blocking solve in an executor, stopping it through its cutoff if the awaiting task is cancelled
+async def runAsync(solve, cutoff, executor=None):
+
+    # Import asyncio on first use so importing the solvers stays fast
+    import asyncio
+
+    future = asyncio.get_running_loop().run_in_executor(executor, solve)
+
+    try:
+        return await asyncio.shield(future)
+
+    # Ask the search to stop and wait for its thread to let go before passing the cancellation on
+    except asyncio.CancelledError:
+        cutoff.stop.set()
+        await asyncio.wait([future])
+        raise
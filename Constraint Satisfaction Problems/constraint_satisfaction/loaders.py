@@ -0,0 +1,161 @@
+# Streaming loaders for problem files
+#
+# DIMACS graph colouring files (.col) hold comment lines 'c ...', one problem line
+# 'p edge <vertices> <edges>' and one line 'e <u> <v>' per edge, with vertices
+# numbered from 1. Circuit board specs hold one 'board <width> <height>' line
+# followed by one '<name> <width> <height>' line per component, with blank lines
+# and '#' comments allowed. Either may be gzip-compressed.
+import contextlib
+import gzip
+import io
+import os
+from array import array
+
+from .generators import MAP_COLORS
+
+# First bytes of every gzip stream
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Wrap the edges of a loaded graph as a read-only sequence of (u, v) constraints
+#
+# The edges stay in the two id arrays the adjacency index was built from, so a
+# graph with millions of edges is not copied into a list of tuples.
+class EdgeList:
+
+    def __init__(self, variables, first, second):
+
+        # Region names, indexed by integer id
+        self.variables = variables
+        # Endpoint ids of each edge as two parallel arrays
+        self.first = first
+        self.second = second
+
+    # Get the number of edges
+    def __len__(self):
+
+        return len(self.first)
+
+    # Get one edge as a pair of region names
+    def __getitem__(self, index):
+
+        return self.variables[self.first[index]], self.variables[self.second[index]]
+
+    # Yield every edge as a pair of region names
+    def __iter__(self):
+
+        variables = self.variables
+        for a, b in zip(self.first, self.second):
+            yield variables[a], variables[b]
+
+# Open a path or file object for reading text line by line, decompressing gzip input
+#
+# Files opened from a path are closed afterwards; file objects passed in are left open.
+@contextlib.contextmanager
+def openText(source):
+
+    # Paths are sniffed for the gzip magic rather than trusting the extension
+    if isinstance(source, (str, bytes, os.PathLike)):
+        with open(source, 'rb') as handle:
+            compressed = handle.read(2) == GZIP_MAGIC
+        with (gzip.open(source, 'rt') if compressed else open(source)) as lines:
+            yield lines
+        return
+
+    # Text file objects are read as they are
+    if isinstance(source, io.TextIOBase):
+        yield source
+        return
+
+    # Binary file objects are sniffed through a buffer that can peek, and decoded
+    buffered = source if hasattr(source, 'peek') else io.BufferedReader(source)
+    if buffered.peek(2)[:2] == GZIP_MAGIC:
+        buffered = gzip.GzipFile(fileobj=buffered)
+    lines = io.TextIOWrapper(buffered)
+
+    try:
+        yield lines
+    finally:
+        lines.detach()
+
+# Stream a DIMACS .col file into a map colouring CSP whose regions are the vertex numbers
+def readCol(source, colors=MAP_COLORS, **options):
+
+    from .map_problem import CSP, AdjacencyIndex
+
+    variables = None
+    # Endpoint ids of each edge, filled straight from the file
+    first, second = array('l'), array('l')
+
+    with openText(source) as lines:
+        for number, line in enumerate(lines, 1):
+            fields = line.split()
+            if not fields or fields[0] == 'c':
+                continue
+
+            # The problem line sizes the graph; 'col' is an older spelling of 'edge'
+            if fields[0] == 'p':
+                if len(fields) < 4 or fields[1] not in ('edge', 'col'):
+                    raise ValueError('line %d: expected "p edge <vertices> <edges>"' % number)
+                variables = list(range(1, int(fields[2]) + 1))
+
+            elif fields[0] == 'e':
+                if len(fields) < 3:
+                    raise ValueError('line %d: expected "e <u> <v>"' % number)
+                if variables is None:
+                    raise ValueError('line %d: edge before the problem line' % number)
+                u, v = int(fields[1]), int(fields[2])
+                if not (1 <= u <= len(variables) and 1 <= v <= len(variables)):
+                    raise ValueError('line %d: vertex out of range' % number)
+
+                # Self loops can never be coloured and are left out, as the adjacency index does
+                if u != v:
+                    first.append(u - 1)
+                    second.append(v - 1)
+
+    if variables is None:
+        raise ValueError('missing problem line')
+
+    index = AdjacencyIndex(variables, (), (first, second))
+
+    return CSP(variables, list(colors), EdgeList(index.variables, first, second), index=index, **options)
+
+# Stream a circuit board spec into a circuit board CSP with its placement masks precomputed
+def readBoard(source, **options):
+
+    from .circuit_board import CSP, Bitboard
+
+    bitboard = None
+    # Dictionary of component name -> (w, h), and the legacy domains of each component
+    variables = {}
+    domains = []
+
+    with openText(source) as lines:
+        for number, line in enumerate(lines, 1):
+            fields = line.split('#', 1)[0].split()
+            if not fields:
+                continue
+            if len(fields) != 3:
+                raise ValueError('line %d: expected "<name> <width> <height>"' % number)
+
+            name, width, height = fields[0], int(fields[1]), int(fields[2])
+
+            if name == 'board':
+                if bitboard is not None:
+                    raise ValueError('line %d: second board line' % number)
+                bitboard = Bitboard(width, height, [])
+                continue
+
+            if bitboard is None:
+                raise ValueError('line %d: component before the board line' % number)
+            if name in variables:
+                raise ValueError('line %d: duplicate component %s' % (number, name))
+
+            # Precompute the masks of each new shape as soon as it is read
+            variables[name] = (width, height)
+            domains.append((bitboard.width - width, bitboard.height - height))
+            bitboard.addComponent((width, height))
+
+    if bitboard is None:
+        raise ValueError('missing board line')
+
+    return CSP(variables, domains, (bitboard.width, bitboard.height), bitboard=bitboard, **options)
@@ -0,0 +1,1916 @@
+# Ben Lehrburger
+# COSC 076 PA4
+import copy
+import os
+import random
+import time
+from array import array
+from collections import deque
+from itertools import islice
+from .instrumentation import SearchStats, SearchCancelled, Cutoff, RestartLimit, restartLimits, searchOutcome, runAsync
+from .sat import MapEncoding, CDCLSolver
+
+# Wrap a CSP solver object for the map problem
+class CSP:
+
+    def __init__(self, variables, domains, constraints, variable_order='degree', value_order='lcv', hook=None, representation='list', index=None, restarts=None, seed=0):
+
+        # Variables list
+        self.variables = variables
+        # Domains list
+        self.domains = domains
+        # Constraints list of tuples
+        self.constraints = constraints
+        # Adjacency index of the constraint graph, built once unless a loader has already built it
+        self.index = index if index is not None else AdjacencyIndex(variables, constraints)
+        # Variable ordering: 'degree', 'mrv' or 'dsatur'
+        self.variable_order = variable_order
+        # Value ordering: 'lcv' or 'domain'
+        self.value_order = value_order
+        # Domain representation of the MRV and degree searches: 'list' of colors or 'bitmask'
+        self.representation = representation
+        # Optional callback for each search event, as hook(event, stats)
+        self.hook = hook
+        # Statistics of the latest solve
+        self.stats = SearchStats(hook)
+        # Deadline, node budget and cancellation flag of an outcome-returning solve, or None
+        self.cutoff = None
+        # Largest set of regions with a single color left, tracked while a cutoff is set
+        self.partial = {}
+        # Restart schedule of the recursive search: None to run once, 'luby' or 'geometric'
+        self.restarts = restarts
+        # Backtracks allowed in the first run of the schedule
+        self.restart_base = 100
+        # Backtrack count at which the current run is abandoned, or None
+        self.restart_limit = None
+        # Seed of the random source, and the source itself, for breaking ties between runs
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # Rank breaking ties between regions, lowest first; shuffled at every restart
+        self.rank = {region: position for position, region in enumerate(variables)}
+        # Learned weight of each constraint as {(region, neighbor): weight}, kept across restarts; unseen ones weigh 1
+        self.weights = {}
+
+    # Solve the CSP
+    def csp_solver(self):
+
+        result = self.solve()
+
+        # Print the formatted result unless we have failed
+        if result == 'failure':
+            return result
+        return self.format(result)
+
+    # Solve the CSP without printing, returning {region: color} or 'failure'
+    def solve(self):
+
+        # Start fresh statistics for this solve
+        self.stats = SearchStats(self.hook)
+
+        # DSATUR and the bitmask search keep their own incremental state, so take their first solution
+        search = self.getSearch()
+        if search is not None:
+            return next(search.solutions(), 'failure')
+
+        # Recursively call the backtrack function
+        result = self.runBacktrack()
+
+        if result == 'failure':
+            return result
+
+        return self.unwrap(result)
+
+    # Solve within a deadline in seconds and/or a node budget
+    #
+    # Returns {'status', 'solution', 'partial', 'stats'}, where status is 'solved', 'failure',
+    # 'deadline', 'budget' or 'cancelled' and partial is the largest consistent colouring reached.
+    def solveWithin(self, deadline=None, budget=None, cutoff=None):
+
+        self.stats = SearchStats(self.hook)
+        self.cutoff = cutoff or Cutoff(deadline, budget)
+        self.partial = {}
+
+        # DSATUR and the bitmask search track their own deepest colouring
+        search = self.getSearch()
+
+        try:
+            if search is not None:
+                result = next(search.solutions(), 'failure')
+            else:
+                result = self.runBacktrack()
+                if result != 'failure':
+                    result = self.unwrap(result)
+
+        except SearchCancelled as cancelled:
+            partial = search.getPartial() if search is not None else self.partial
+            return searchOutcome(cancelled.reason, None, partial, self.stats)
+
+        finally:
+            self.cutoff = None
+
+        if result == 'failure':
+            partial = search.getPartial() if search is not None else self.partial
+            return searchOutcome('failure', None, partial, self.stats)
+        return searchOutcome('solved', result, result, self.stats)
+
+    # Solve like solveWithin on an executor thread, giving up early if the awaiting task is cancelled
+    async def solveAsync(self, deadline=None, budget=None, executor=None):
+
+        cutoff = Cutoff(deadline, budget)
+
+        return await runAsync(lambda: self.solveWithin(cutoff=cutoff), cutoff, executor)
+
+    # Run the recursive search once, or on the restart schedule until a run finishes within its backtrack limit
+    def runBacktrack(self):
+
+        if self.restarts is None:
+            return self.backtrack(self.get_assignment())
+
+        stats = self.stats
+        regions = list(self.variables)
+
+        try:
+            for limit in restartLimits(self.restarts, self.restart_base):
+                self.restart_limit = stats.backtracks + limit
+
+                try:
+                    return self.backtrack(self.get_assignment())
+
+                # Start over with the ties broken another way, keeping the learned weights
+                except RestartLimit:
+                    stats.restarts += 1
+                    if stats.hook is not None:
+                        stats.hook('restarts', stats)
+                    self.rng.shuffle(regions)
+                    self.rank = {region: position for position, region in enumerate(regions)}
+
+        finally:
+            self.restart_limit = None
+
+    # Get the incremental search for the chosen heuristics and representation, or None for the recursive search
+    def getSearch(self):
+
+        if self.variable_order == 'dsatur':
+            return DsaturSearch(self)
+        if self.representation == 'bitmask':
+            return BitmaskSearch(self)
+
+        return None
+
+    # Colour the map by min-conflicts local search, returning {region: color} or 'failure'
+    #
+    # Local search scales to maps far too large for the complete searches but cannot prove
+    # that no colouring exists; with fallback it runs the complete search after max_steps steps
+    # or deadline seconds. Tight maps of a hundred thousand regions or more can take minutes to
+    # use up the default hundred steps per region and still fail, so give those a deadline.
+    def solveLocal(self, max_steps=None, seed=0, initial='greedy', fallback=False, deadline=None):
+
+        self.stats = SearchStats(self.hook)
+        result = MinConflictsSearch(self, max_steps, seed, initial, deadline=deadline).solve()
+
+        # Keep the moves in the statistics of the complete search
+        if result == 'failure' and fallback:
+            moves = self.stats
+            result = self.solve()
+            self.stats.merge(moves)
+
+        return result
+
+    # Solve the CSP as SAT with the built-in CDCL solver, returning {region: color} or 'failure'
+    def satSolver(self):
+
+        encoding = MapEncoding(self)
+        solver = CDCLSolver(encoding.formula, self.hook)
+        solver.cutoff = self.cutoff
+        self.stats = solver.stats
+
+        model = solver.solve()
+        if model is None:
+            return 'failure'
+
+        return encoding.decode(model)
+
+    # Write the SAT encoding of the CSP as DIMACS CNF to a path or an open text file
+    def writeCNF(self, target):
+
+        encoding = MapEncoding(self)
+        comments = ['map colouring of %d regions with %d colors' % (len(self.variables), len(self.domains)),
+                    'variable i * colors + c + 1 gives region i color c, in input order']
+
+        encoding.formula.writeDimacs(target, comments)
+
+    # Split the map into independent pieces, as (variables, constraints) pairs over the same colors
+    #
+    # Pieces are the connected components, or with blocks the biconnected blocks,
+    # which share articulation regions and are stitched back together by solveDecomposed.
+    def decompose(self, blocks=False):
+
+        index = self.index
+        count = len(self.variables)
+        names = index.variables
+
+        if blocks:
+            pieces = index.biconnectedBlocks(count)
+        else:
+            pieces = index.connectedComponents(count)
+
+        instances = []
+        for piece in pieces:
+            members = set(piece)
+            # Keep each edge once, from its lower id, and only inside the piece
+            constraints = [(names[region], names[neighbor]) for region in piece for neighbor in index.neighborIds(region) if region < neighbor and neighbor in members]
+            instances.append(([names[region] for region in sorted(piece)], constraints))
+
+        return instances
+
+    # Get the constructor options that steer the search, for building CSPs that search the same way
+    def searchOptions(self):
+
+        return {'variable_order': self.variable_order, 'value_order': self.value_order, 'representation': self.representation, 'restarts': self.restarts, 'seed': self.seed}
+
+    # Solve each independent piece of the map on its own, in parallel once a piece is large enough
+    #
+    # Returns {region: color} or 'failure'. With blocks, each block is colored on its own
+    # and the colors of a block are swapped so it agrees with the blocks already placed
+    # at the articulation region they share; every region has the same colors, so any
+    # swap of a proper colouring is still proper.
+    def solveDecomposed(self, blocks=False, workers=1, threshold=2000):
+
+        self.stats = SearchStats(self.hook)
+        instances = self.decompose(blocks)
+        options = self.searchOptions()
+
+        # Solve the large pieces on a pool and the rest here
+        large = [number for number, (variables, constraints) in enumerate(instances) if len(variables) >= threshold]
+        results = [None] * len(instances)
+        futures = {}
+        executor = None
+
+        if workers > 1 and large:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(min(workers, len(large)))
+            futures = {number: executor.submit(solvePiece, instances[number], self.domains, options, self.restart_base) for number in large}
+
+        try:
+            for number, (variables, constraints) in enumerate(instances):
+                if number in futures:
+                    continue
+
+                piece = CSP(variables, self.domains, constraints, hook=self.hook, **options)
+                piece.restart_base = self.restart_base
+                results[number] = piece.solve()
+                self.stats.merge(piece.stats)
+
+                # A piece that cannot be coloured means the map cannot either
+                if results[number] == 'failure':
+                    return 'failure'
+
+            for number, future in futures.items():
+                results[number], stats = future.result()
+                self.stats.merge(stats)
+                if results[number] == 'failure':
+                    return 'failure'
+
+        # Drop the pieces still queued by hand, since shutdown only takes cancel_futures from Python 3.9
+        finally:
+            if executor is not None:
+                for future in futures.values():
+                    future.cancel()
+                executor.shutdown(wait=True)
+
+        if not blocks:
+            return {region: color for result in results for region, color in result.items()}
+
+        return self.stitchBlocks(results)
+
+    # Merge the colourings of biconnected blocks, swapping colors to agree at shared regions
+    def stitchBlocks(self, results):
+
+        # Blocks containing each region
+        containing = {}
+        for number, result in enumerate(results):
+            for region in result:
+                containing.setdefault(region, []).append(number)
+
+        coloring = {}
+        placed = [False] * len(results)
+
+        # Walk the block-cut tree of each component, placing each block once its shared region is coloured
+        for first in range(len(results)):
+            if placed[first]:
+                continue
+
+            placed[first] = True
+            coloring.update(results[first])
+            queue = deque([first])
+
+            while queue:
+                for region in results[queue.popleft()]:
+                    for number in containing[region]:
+                        if placed[number]:
+                            continue
+
+                        # Swap the block's color at the shared region with the one it already has
+                        have, want = results[number][region], coloring[region]
+                        swap = {have: want, want: have}
+                        for other, color in results[number].items():
+                            coloring[other] = swap.get(color, color)
+
+                        placed[number] = True
+                        queue.append(number)
+
+        return coloring
+
+    # Keep the colours of the regions narrowed to one if there are more of them than in the best so far
+    def notePartial(self, assignment):
+
+        colored = {region: value for region, value in assignment.items() if len(value) == 1}
+
+        if len(colored) > len(self.partial):
+            self.partial = self.unwrap(colored)
+
+    # Lazily yield every solution as {region: color}, or only the first limit of them
+    def solutions(self, limit=None):
+
+        # Start fresh statistics for this enumeration
+        self.stats = SearchStats(self.hook)
+
+        search = self.getSearch()
+        if search is not None:
+            return islice(search.solutions(), limit)
+
+        # The search stays paused inside the generator until the next solution is asked for
+        return islice(map(self.unwrap, self.enumerate(self.get_assignment())), limit)
+
+    # Yield every complete assignment below the current one
+    def enumerate(self, assignment):
+
+        # Count the node
+        stats = self.stats
+        stats.nodes += 1
+        if stats.hook is not None:
+            stats.hook('nodes', stats)
+
+        # If all variables have been assigned values
+        if self.complete(assignment):
+            yield assignment
+            return
+
+        # Choose a region to assign to based on MRV or DH heuristics
+        start = time.perf_counter()
+        if self.variable_order == 'mrv':
+            region = self.minimumRemainingValue(assignment)
+            stats.time('minimumRemainingValue', start)
+        else:
+            region = self.degreeHeuristic(assignment)
+            stats.time('degreeHeuristic', start)
+
+        # Order the values on a copy of the region's domain, which the least constraining value method narrows
+        if self.value_order == 'lcv':
+            start = time.perf_counter()
+            values = self.leastConstrainingValue({**assignment, region: list(assignment[region])}, region)
+            stats.time('leastConstrainingValue', start)
+
+            # The method returns a bare color or 'failure' instead of a one or zero item list
+            if values == 'failure':
+                values = []
+            elif not isinstance(values, list):
+                values = [values]
+
+            # Follow with any colors it left out so no solution is skipped
+            values = values + [value for value in assignment[region] if value not in values]
+        else:
+            values = list(assignment[region])
+
+        found = False
+
+        for value in values:
+            # Recurse on a copy of the assignment so every branch starts from the same domains
+            if self.isConsistent(value, region, assignment):
+
+                start = time.perf_counter()
+                consistent, new_assignment = self.arcConsistency({**assignment, region: value})
+                stats.time('arcConsistency', start)
+
+                if consistent:
+                    for solution in self.enumerate(new_assignment):
+                        found = True
+                        yield solution
+
+        # Count a dead end if nothing below this node was a solution
+        if not found:
+            stats.backtracks += 1
+            if stats.hook is not None:
+                stats.hook('backtracks', stats)
+
+    # Backtrack if we have an inconsistent value choice
+    def backtrack(self, assignment):
+
+        # Count the node
+        stats = self.stats
+        stats.nodes += 1
+        if stats.hook is not None:
+            stats.hook('nodes', stats)
+
+        # Note the deepest colouring so far and give up once the cutoff is reached
+        if self.cutoff is not None:
+            self.notePartial(assignment)
+            self.cutoff.check(stats)
+
+        # If all variables have been assigned values
+        if self.complete(assignment):
+            # Return the completed assignment
+            return assignment
+
+        # Choose a region to assign to based on MRV or DH heuristics
+        start = time.perf_counter()
+        if self.variable_order == 'mrv':
+            region = self.minimumRemainingValue(assignment)
+            stats.time('minimumRemainingValue', start)
+        else:
+            region = self.degreeHeuristic(assignment)
+            stats.time('degreeHeuristic', start)
+        # Store the old assignment in case the current is inconsistent
+        old_value = assignment[region]
+
+        # Choose the least constraining values in order, or the domain order
+        if self.value_order == 'lcv':
+            start = time.perf_counter()
+            values = self.leastConstrainingValue(assignment, region)
+            stats.time('leastConstrainingValue', start)
+        else:
+            values = list(assignment[region])
+
+        for value in values:
+            # If that value is consistent
+            if self.isConsistent(value, region, assignment):
+
+                # Assign it to the current region
+                assignment[region] = value
+                start = time.perf_counter()
+                # Check for arc consistency
+                consistent = self.arcConsistency(assignment)[0]
+                # Get the assignment inferences from arc consistency method
+                new_assignment = self.arcConsistency(assignment)[1]
+                stats.time('arcConsistency', start)
+
+                # If the assignment is arc consistent
+                if consistent:
+                    # Recursively backtrack
+                    result = self.backtrack(new_assignment)
+
+                    # If our assignments are inconsistent
+                    if result != 'failure':
+                        # Return that we have failed
+                        return result
+
+            # If the value is inconsistent assign it to the old value
+            else:
+                assignment[region] = old_value
+
+                # Blame the constraints the value broke so later runs branch on them sooner
+                if self.restarts is not None:
+                    self.bumpWeights(region, value, assignment)
+
+        # If we run out of value, return that we have failed
+        stats.backtracks += 1
+        if stats.hook is not None:
+            stats.hook('backtracks', stats)
+
+        # Abandon this run once it has spent its backtrack limit
+        if self.restart_limit is not None and stats.backtracks >= self.restart_limit:
+            raise RestartLimit()
+
+        return 'failure'
+
+    # Add one to the weight of each constraint between a region and the neighbors that already hold a value
+    def bumpWeights(self, region, value, assignment):
+
+        for neighbor in self.index.neighbors(region):
+            if assignment[neighbor] == value:
+                key = (region, neighbor) if region < neighbor else (neighbor, region)
+                self.weights[key] = self.weights.get(key, 1) + 1
+
+    # Sum the learned weights of the constraints between a region and its unassigned neighbors (wdeg)
+    def weightedDegree(self, region, assignment):
+
+        weights = self.weights
+        total = 0
+
+        for neighbor in self.index.neighbors(region):
+            if len(assignment[neighbor]) > 1:
+                total += weights.get((region, neighbor) if region < neighbor else (neighbor, region), 1)
+
+        return total
+
+    # Check if the current value is consistent with our other assignments
+    def isConsistent(self, value, domain, assignment):
+
+        # Count the check
+        stats = self.stats
+        stats.checks += 1
+        if stats.hook is not None:
+            stats.hook('checks', stats)
+
+        # For each neighbor in the adjacency index
+        for region in self.index.neighbors(domain):
+            # Return false f a neighbor has the same color as the current value
+            if assignment[region] == value:
+                return False
+
+        # Otherwise return true
+        return True
+
+    # Check if our assignment is complete
+    def complete(self, assignment):
+
+        # Count the number of variables with just 1 assignment
+        completeness = 0
+
+        # For each key and value in our assignment
+        for key, value in assignment.items():
+
+            # Mark a key as complete if it has only 1 value assigned to it
+            if len(value) == 1:
+                completeness += 1
+
+        # Return true if all variables are assigned
+        if completeness == len(self.variables):
+            return True
+
+        # Otherwise return false
+        return False
+
+    # Get the minimum remaining value
+    def minimumRemainingValue(self, assignment):
+
+        # Get unassigned variables
+        unassigned = self.pickUnassignedVariables(assignment)
+
+        # Under restarts, divide each domain size by the learned weight of the region (dom/wdeg) and break ties by rank
+        if self.restarts is not None:
+            rank = self.rank
+            return min(unassigned, key=lambda region: (len(assignment[region]) / max(self.weightedDegree(region, assignment), 1), rank[region]))
+
+        # Store the first as the MRV
+        minimum_remaining_value = unassigned[0]
+        # Store that variables restrictions as the number of potential values remaining
+        max_restrictions = len(assignment[minimum_remaining_value])
+
+        # For each unassigned variable
+        for variable in unassigned:
+
+            # If it has less restrictions than our minimum
+            if len(assignment[variable]) < max_restrictions:
+                # Store it as the MRV
+                minimum_remaining_value = variable
+                # Store its restrictions
+                max_restrictions = len(assignment[variable])
+
+        return minimum_remaining_value
+
+    # Get the variable involved with the largest number of constraints on other unassigned variables
+    def degreeHeuristic(self, assignment):
+
+        # Set dummy variable to hold subsequently chose region
+        heuristic = None
+        # Max degree of constraints is initially 0
+        max_degree = 0
+        # Get unassigned variables
+        unassigned = self.pickUnassignedVariables(assignment)
+
+        # Under restarts, weigh the constraints on other unassigned regions by what they have learned and break ties by rank
+        if self.restarts is not None:
+            rank = self.rank
+            return max(unassigned, key=lambda region: (self.weightedDegree(region, assignment), -rank[region]), default=None)
+
+        # For each unassigned variable
+        for region in unassigned:
+
+            # Look up the number of constraints the current region is involved with
+            current_degree = self.index.degree(region)
+
+            # If that variable has the greatest number of constraints on other variables
+            if current_degree >= max_degree:
+                # Update the maximum degree
+                max_degree = current_degree
+                # Update the most constraining variable
+                heuristic = region
+
+        return heuristic
+
+    # Get a list of the least constraining values in increasing order
+    def leastConstrainingValue(self, assignment, region):
+
+        # Get the current region's neighbors
+        neighbors = self.getNeighbors(region)
+        # Track how many times the value is implicated
+        frequencies = []
+        # Store its possible assignments
+        possible_values = assignment[region]
+
+        # For each neighbor
+        for neighbor in neighbors:
+
+            # If that neighbor already has an assignment and it's one of the current region's possible assignments
+            if len(assignment[neighbor]) == 1 and assignment[neighbor] in possible_values:
+                # Remove that value from the region's possible assignments
+                possible_values.remove(assignment[neighbor])
+
+        # Return that we failed if there are no more possible assignments
+        if len(possible_values) == 0:
+            return 'failure'
+
+        # Return assignment if there's only one possible value
+        elif len(possible_values) == 1:
+            return possible_values[0]
+
+        # The assignment can be anything if there are no neighbors
+        elif not neighbors:
+            return possible_values
+
+        # Otherwise if there are possible assignments
+        else:
+
+            # For each neighbor
+            for neighbor in neighbors:
+                # For each possible neighboring value
+                for value in assignment[neighbor]:
+
+                    # If that value is a possible value in the current region
+                    if value in possible_values:
+                        # Add it to the frequencies list
+                        frequencies.append(value)
+
+            # Under restarts, shuffle the counts so ties between equally constraining values fall differently on each run
+            if self.restarts is not None:
+                self.rng.shuffle(frequencies)
+
+            # Initialize a list to hold the values in order
+            value_order = []
+
+            # While there are still value constraints
+            while len(frequencies) > 0:
+
+                # Grab the least constraining value
+                least_constraining = min(frequencies, key=frequencies.count)
+
+                # Append it to our list of values in order
+                if least_constraining not in value_order:
+                    value_order.append(least_constraining)
+
+                # Delete that value from the frequency tracker
+                try:
+                    while True:
+                        frequencies.remove(least_constraining)
+                except ValueError:
+                    pass
+
+            return value_order
+
+    # Check if the CSP is arc consistent under the current assignment
+    def arcConsistency(self, curr_domain):
+
+        # Make a deepcopy of the current domain so we can edit it
+        domain = copy.deepcopy(curr_domain)
+
+        # Initialize a queue of arcs
+        arcs = []
+
+        # Populate the queue with each set of constraints
+        for constraint in self.constraints:
+            if len(constraint) > 1:
+                arcs.append(constraint)
+
+        # While the arcs queue is not empty
+        while arcs:
+
+            # Remove the first arc
+            arc = arcs.pop()
+            # Store the coordinates of those arcs
+            x1, x2 = arc[0], arc[1]
+
+            # Store boolean as to whether the assignment was revised
+            revised = self.removeInconsistentValues(x1, x2, domain)[0]
+            # Store the revised assignment
+            domain = self.removeInconsistentValues(x1, x2, domain)[1]
+
+            # If the assignment was revised
+            if revised:
+
+                # Return false if there are no more values for the current variable
+                if len(domain[x1]) == 0:
+                    return False, domain
+
+                # Remove the constraining variable from the current coordinate's list of neighbors
+                neighbors = self.getNeighbors(x1)
+                neighbors.remove(x2)
+
+                # Add every other neighbor to the queue
+                for neighbor in neighbors:
+                    arcs.append((neighbor, x1))
+
+        return True, domain
+
+    # Helper function for the arc consistency method
+    def removeInconsistentValues(self, x1, x2, curr_domain):
+
+        # Boolean to track whether the current assignment was revised or not
+        revised = False
+        # Store the current arc's coordinates
+        d1, d2 = curr_domain[x1], curr_domain[x2]
+        # Make a deepcopy of the assignment so we can edit it
+        domain_copy = copy.deepcopy(curr_domain)
+
+        # For each value in the first coordinate's domain
+        for v1 in d1:
+
+            # If no value in the second coordinate domains satisfies the constraint
+            if v1 in d2 and len(d2) == 1:
+                # Delete the current coordinate from its domain
+                domain_copy[x1].remove(v1)
+                # Flag that the assignment was revised
+                revised = True
+
+        # Count the revision and the values it removed
+        if revised:
+            self.stats.countRevision(len(d1) - len(domain_copy[x1]))
+
+        return revised, curr_domain
+
+    # HELPER FUNCTIONS
+
+    # Get the string versions of keys and values
+    def encode(self, string):
+
+        if string == 'sa':
+            return 'South Australia'
+        if string == 'wa':
+            return 'Western Australia'
+        if string == 'nt':
+            return 'Northern Territory'
+        if string == 'q':
+            return 'Queensland'
+        if string == 'nsw':
+            return "New South Wales"
+        if string == 'v':
+            return 'Victoria'
+        if string == 't':
+            return 'Tasmania'
+        if string == 'r':
+            return 'red'
+        if string == 'g':
+            return 'green'
+        if string == 'b':
+            return 'blue'
+
+    # Format the outputted assignment
+    def format(self, assignment):
+
+        for key, value in assignment.items():
+            print('The region ' + str(self.encode(key)) + ' is colored ' + str(self.encode(value)))
+
+    # Get a solved assignment as {region: color}, unwrapping any region whose domain was narrowed to a single color
+    def unwrap(self, assignment):
+
+        return {region: value[0] if isinstance(value, list) else value for region, value in assignment.items()}
+
+    # Get the neighboring nodes of a region
+    def getNeighbors(self, region):
+
+        return self.index.neighbors(region)
+
+    # Get the initial domains of each variable at the beggining of the CSP
+    def get_assignment(self):
+        assignment = {}
+
+        for variable in self.variables:
+            assignment[variable] = copy.deepcopy(self.domains)
+
+        return assignment
+
+    # Get the variables that have no yet been assigned
+    def pickUnassignedVariables(self, assignment):
+        variables = []
+
+        for key, value in assignment.items():
+            if len(value) > 1:
+                variables.append(key)
+
+        return variables
+
+# Wrap a compressed sparse row (CSR) index of the constraint graph
+class AdjacencyIndex:
+
+    def __init__(self, variables, constraints, edges=None):
+
+        # Region names, indexed by integer id
+        self.variables = list(variables)
+        # Integer id of each region
+        self.ids = {region: index for index, region in enumerate(self.variables)}
+
+        # Endpoint ids of each edge as two parallel arrays, unless a loader has already streamed them in
+        if edges is None:
+            edges = self.collectEdges(constraints)
+        first, second = edges
+
+        # Static degree of each region
+        self.degrees = array('l', [0]) * len(self.variables)
+        for a, b in zip(first, second):
+            self.degrees[a] += 1
+            self.degrees[b] += 1
+
+        # Offsets into the neighbor array, so the neighbors of id i are targets[offsets[i]:offsets[i + 1]]
+        self.offsets = array('l', [0]) * (len(self.variables) + 1)
+        for index in range(0, len(self.variables)):
+            self.offsets[index + 1] = self.offsets[index] + self.degrees[index]
+
+        # Fill the neighbor array in constraint order
+        self.targets = array('l', [0]) * self.offsets[-1]
+        cursor = array('l', self.offsets[:-1])
+        for a, b in zip(first, second):
+            self.targets[cursor[a]] = b
+            cursor[a] += 1
+            self.targets[cursor[b]] = a
+            cursor[b] += 1
+
+    # Collect each constraint as a pair of ids, giving ids to regions only seen in constraints
+    def collectEdges(self, constraints):
+
+        first, second = array('l'), array('l')
+
+        for constraint in constraints:
+
+            # Skip unary constraints such as ('t'), which is just the string 't'
+            if isinstance(constraint, str) or len(constraint) < 2:
+                continue
+
+            # Link every pair of distinct regions in the constraint
+            members = [self.getId(region) for region in constraint]
+            for i in range(0, len(members)):
+                for j in range(i + 1, len(members)):
+                    if members[i] != members[j]:
+                        first.append(members[i])
+                        second.append(members[j])
+
+        return first, second
+
+    # Get the id of a region, adding it if it has not been seen before
+    def getId(self, region):
+
+        if region not in self.ids:
+            self.ids[region] = len(self.variables)
+            self.variables.append(region)
+
+        return self.ids[region]
+
+    # Get the connected components among the first count ids, as lists of ids
+    def connectedComponents(self, count):
+
+        offsets, targets = self.offsets, self.targets
+        seen = bytearray(count)
+        components = []
+
+        for root in range(count):
+            if seen[root]:
+                continue
+
+            # Walk the component with an explicit stack so large maps do not recurse
+            seen[root] = 1
+            component = [root]
+            stack = [root]
+            while stack:
+                region = stack.pop()
+                for neighbor in targets[offsets[region]:offsets[region + 1]]:
+                    if neighbor < count and not seen[neighbor]:
+                        seen[neighbor] = 1
+                        component.append(neighbor)
+                        stack.append(neighbor)
+
+            components.append(component)
+
+        return components
+
+    # Get the biconnected blocks among the first count ids, as sets of ids
+    #
+    # Blocks share only articulation regions, and a region with no neighbors is a
+    # block of its own. This is Tarjan's depth-first search with an edge stack.
+    def biconnectedBlocks(self, count):
+
+        offsets, targets = self.offsets, self.targets
+        # Discovery order and lowest reachable discovery order of each id, or -1 if unvisited
+        order = array('l', [-1]) * count
+        low = array('l', [0]) * count
+        parent = array('l', [-1]) * count
+        counter = 0
+        blocks = []
+
+        for root in range(count):
+            if order[root] != -1:
+                continue
+
+            order[root] = low[root] = counter
+            counter += 1
+            # Stack of [id, position of the next neighbor to visit], and the tree and back edges seen
+            stack = [[root, offsets[root]]]
+            edges = []
+            isolated = True
+
+            while stack:
+                frame = stack[-1]
+                region, position = frame
+
+                # Visit the next neighbor
+                if position < offsets[region + 1]:
+                    frame[1] += 1
+                    neighbor = targets[position]
+                    if neighbor >= count:
+                        continue
+                    isolated = False
+
+                    if order[neighbor] == -1:
+                        parent[neighbor] = region
+                        order[neighbor] = low[neighbor] = counter
+                        counter += 1
+                        edges.append((region, neighbor))
+                        stack.append([neighbor, offsets[neighbor]])
+                    elif neighbor != parent[region] and order[neighbor] < order[region]:
+                        edges.append((region, neighbor))
+                        low[region] = min(low[region], order[neighbor])
+                    continue
+
+                # Every neighbor is done, so report a block if the parent separates this subtree
+                stack.pop()
+                if stack:
+                    above = stack[-1][0]
+                    low[above] = min(low[above], low[region])
+
+                    if low[region] >= order[above]:
+                        block = set()
+                        while True:
+                            edge = edges.pop()
+                            block.update(edge)
+                            if edge == (above, region):
+                                break
+                        blocks.append(block)
+
+            if isolated:
+                blocks.append({root})
+
+        return blocks
+
+    # Get the neighbor ids of a region id
+    def neighborIds(self, index):
+
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
+
+    # Get the neighboring regions of a region
+    def neighbors(self, region):
+
+        if region not in self.ids:
+            return []
+
+        variables = self.variables
+        return [variables[index] for index in self.neighborIds(self.ids[region])]
+
+    # Get the number of constraints a region is involved with
+    def degree(self, region):
+
+        if region not in self.ids:
+            return 0
+
+        return self.degrees[self.ids[region]]
+
+# Wrap a binary heap of ids that supports changing the key of any id in place
+class IndexedHeap:
+
+    def __init__(self):
+
+        # Heap of ids, ordered by key
+        self.heap = []
+        # Key of each id in the heap
+        self.keys = {}
+        # Position of each id within the heap list
+        self.positions = {}
+
+    def __len__(self):
+
+        return len(self.heap)
+
+    def __contains__(self, item):
+
+        return item in self.positions
+
+    # Add an id with a key
+    def push(self, item, key):
+
+        self.keys[item] = key
+        self.positions[item] = len(self.heap)
+        self.heap.append(item)
+        self.siftUp(len(self.heap) - 1)
+
+    # Remove and return the id with the smallest key
+    def pop(self):
+
+        heap = self.heap
+        top = heap[0]
+        last = heap.pop()
+
+        # Move the last id into the hole at the root and let it sink
+        if heap:
+            heap[0] = last
+            self.positions[last] = 0
+            self.siftDown(0)
+
+        del self.positions[top]
+        del self.keys[top]
+
+        return top
+
+    # Change the key of an id already in the heap
+    def update(self, item, key):
+
+        old = self.keys[item]
+        self.keys[item] = key
+
+        if key < old:
+            self.siftUp(self.positions[item])
+        else:
+            self.siftDown(self.positions[item])
+
+    # Move the id at a position up until its parent's key is no larger
+    def siftUp(self, position):
+
+        heap, keys, positions = self.heap, self.keys, self.positions
+        item = heap[position]
+        key = keys[item]
+
+        while position > 0:
+            parent = (position - 1) >> 1
+            if keys[heap[parent]] <= key:
+                break
+            heap[position] = heap[parent]
+            positions[heap[position]] = position
+            position = parent
+
+        heap[position] = item
+        positions[item] = position
+
+    # Move the id at a position down until neither child's key is smaller
+    def siftDown(self, position):
+
+        heap, keys, positions = self.heap, self.keys, self.positions
+        item = heap[position]
+        key = keys[item]
+        size = len(heap)
+
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and keys[heap[child + 1]] < keys[heap[child]]:
+                child += 1
+            if key <= keys[heap[child]]:
+                break
+            heap[position] = heap[child]
+            positions[heap[position]] = position
+            position = child
+
+        heap[position] = item
+        positions[item] = position
+
+# Wrap an iterative DSATUR search that keeps saturation and uncoloured degree up to date on every assignment
+class DsaturSearch:
+
+    def __init__(self, csp):
+
+        index = csp.index
+        # Regions to colour, by id; regions only named in constraints are left out
+        self.regions = list(csp.variables)
+        count = len(self.regions)
+        # Neighbor ids of each region id
+        self.neighbors = [[other for other in index.neighborIds(index.ids[region]) if other < count] for region in self.regions]
+        # Colors, by index
+        self.colors = list(csp.domains)
+        # Color index given to each region, or None while it is uncoloured
+        self.coloring = [None] * count
+        # Number of coloured neighbors of each region with each color
+        self.counts = [[0] * len(self.colors) for region in self.regions]
+        # Number of distinct colors among each region's coloured neighbors
+        self.saturation = [0] * count
+        # Number of uncoloured neighbors of each region
+        self.uncolored = [len(neighbors) for neighbors in self.neighbors]
+        # Uncoloured regions, most saturated first and then by uncoloured degree
+        self.heap = IndexedHeap()
+        for region in range(count):
+            self.heap.push(region, self.key(region))
+        # Value ordering: 'lcv' or 'domain'
+        self.value_order = csp.value_order
+        # Statistics of the solve, shared with the CSP
+        self.stats = csp.stats
+        # Deadline, node budget and cancellation flag shared with the CSP, or None
+        self.cutoff = csp.cutoff
+        # Deepest path reached as (region, color index) pairs, tracked while a cutoff is set,
+        # and how many of its leading pairs the current path still shares
+        self.deepest = []
+        self.shared = 0
+
+    # Keep the path if it is the deepest yet, copying only the pairs it no longer shares with the last one
+    def noteDepth(self, frames):
+
+        if len(frames) > len(self.deepest):
+            self.deepest[self.shared:] = [(frame[0], frame[1][frame[2] - 1]) for frame in frames[self.shared:]]
+            self.shared = len(frames)
+
+    # Get the deepest consistent colouring reached as {region: color}
+    def getPartial(self):
+
+        return {self.regions[region]: self.colors[color] for region, color in self.deepest}
+
+    # Get the heap key of a region
+    def key(self, region):
+
+        return (-self.saturation[region], -self.uncolored[region], region)
+
+    # Yield every colouring as {region: color}, keeping the search paused between them
+    def solutions(self):
+
+        stats = self.stats
+
+        # Open the first node; an empty map has a single empty colouring
+        region = self.select()
+        if region is None:
+            yield {}
+            return
+
+        # Stack of [region, color indices in order, number tried]
+        frames = [[region, self.orderValues(region), 0]]
+
+        while frames:
+            frame = frames[-1]
+            region, values, tried = frame
+
+            # Undo the color tried last at this node
+            if self.coloring[region] is not None:
+                self.unassign(region)
+
+            # Hand the region back to the heap once its colors are used up
+            if tried == len(values):
+                self.heap.push(region, self.key(region))
+                frames.pop()
+
+                stats.backtracks += 1
+                if stats.hook is not None:
+                    stats.hook('backtracks', stats)
+                continue
+
+            frame[2] += 1
+            # The path leaves the deepest one at this node at the latest
+            self.shared = min(self.shared, len(frames) - 1)
+
+            # Color the region and open the next node unless a neighbor has no colors left
+            if self.assign(region, values[tried]):
+
+                # Note the deepest colouring so far and give up once the cutoff is reached
+                if self.cutoff is not None:
+                    self.noteDepth(frames)
+                    self.cutoff.check(stats)
+
+                following = self.select()
+
+                if following is None:
+                    yield {self.regions[other]: self.colors[color] for other, color in enumerate(self.coloring)}
+                else:
+                    frames.append([following, self.orderValues(following), 0])
+
+    # Take the most saturated uncoloured region off the heap, or None if every region is coloured
+    def select(self):
+
+        stats = self.stats
+        stats.nodes += 1
+        if stats.hook is not None:
+            stats.hook('nodes', stats)
+
+        if not self.heap:
+            return None
+
+        start = time.perf_counter()
+        region = self.heap.pop()
+        stats.time('dsatur', start)
+
+        return region
+
+    # Order the colors no coloured neighbor uses, least constraining first
+    def orderValues(self, region):
+
+        stats = self.stats
+        counts = self.counts[region]
+        values = [color for color in range(len(self.colors)) if not counts[color]]
+
+        # Count the checks made against the coloured neighbors
+        stats.checks += len(self.colors)
+        if stats.hook is not None:
+            stats.hook('checks', stats)
+
+        if self.value_order != 'lcv' or len(values) < 2:
+            return values
+
+        # Count in one pass over the neighbors how many uncoloured ones could still take each color
+        start = time.perf_counter()
+        frequencies = [0] * len(self.colors)
+        coloring = self.coloring
+        for neighbor in self.neighbors[region]:
+            if coloring[neighbor] is None:
+                for color, used in enumerate(self.counts[neighbor]):
+                    if not used:
+                        frequencies[color] += 1
+
+        values.sort(key=frequencies.__getitem__)
+        stats.time('leastConstrainingValue', start)
+
+        return values
+
+    # Color a region and update its neighbors, returning false if one of them has no colors left
+    def assign(self, region, color):
+
+        self.coloring[region] = color
+        consistent = True
+        full = len(self.colors)
+        stats = self.stats
+
+        for neighbor in self.neighbors[region]:
+            self.uncolored[neighbor] -= 1
+
+            if self.coloring[neighbor] is None:
+                counts = self.counts[neighbor]
+                counts[color] += 1
+
+                # The neighbor loses the color if no other neighbor of its already uses it
+                if counts[color] == 1:
+                    self.saturation[neighbor] += 1
+                    stats.pruned += 1
+                    if self.saturation[neighbor] == full:
+                        consistent = False
+
+                self.heap.update(neighbor, self.key(neighbor))
+
+        if stats.hook is not None:
+            stats.hook('pruned', stats)
+
+        return consistent
+
+    # Remove a region's color and restore its neighbors
+    def unassign(self, region):
+
+        color = self.coloring[region]
+        self.coloring[region] = None
+
+        for neighbor in self.neighbors[region]:
+            self.uncolored[neighbor] += 1
+
+            if self.coloring[neighbor] is None:
+                counts = self.counts[neighbor]
+                counts[color] -= 1
+
+                if counts[color] == 0:
+                    self.saturation[neighbor] -= 1
+
+                self.heap.update(neighbor, self.key(neighbor))
+
+# Wrap an iterative search over one color bitmask per region, maintaining arc consistency with residual supports
+#
+# Regions are the integer ids of the adjacency index and each domain is a word whose
+# bit c is set while color c is still possible. Every arc x -> y of the constraint graph
+# is a position in the index's neighbor array, which also keys its residual supports.
+class BitmaskSearch:
+
+    def __init__(self, csp):
+
+        index = csp.index
+        # Regions to colour, by id; regions only named in constraints are left out
+        self.regions = list(csp.variables)
+        count = len(self.regions)
+        # Colors, by bit
+        self.colors = list(csp.domains)
+        if len(self.colors) > 64:
+            raise ValueError('bitmask domains hold at most 64 colors, got %d' % len(self.colors))
+        # Live colors of each region as a bitmask
+        self.domains = array('Q', [(1 << len(self.colors)) - 1]) * count
+        # Neighbor array and row offsets of the adjacency index
+        self.offsets = index.offsets
+        self.targets = index.targets
+        # Position of the reverse arc y -> x for the arc x -> y at each position
+        self.reverse = array('l', [0]) * len(self.targets)
+        positions = {}
+        for x in range(count):
+            for position in range(self.offsets[x], self.offsets[x + 1]):
+                positions[(x, self.targets[position])] = position
+        for (x, y), position in positions.items():
+            self.reverse[position] = positions.get((y, x), position)
+        # Last supporting color bit found in y for each color of x, by arc position and color
+        self.residues = array('Q', [0]) * (len(self.targets) * len(self.colors))
+        # Stack of (region, previous bitmask) pairs, one per domain change
+        self.trail = []
+        # Whether each region has been chosen by the search
+        self.assigned = [False] * count
+        # Static degree of each region
+        self.degrees = [self.offsets[region + 1] - self.offsets[region] for region in range(count)]
+        # Variable ordering: 'mrv' or 'degree', and value ordering: 'lcv' or 'domain'
+        self.variable_order = csp.variable_order
+        self.value_order = csp.value_order
+        # Unchosen regions keyed by (live colors, id) for MRV, updated as their domains shrink and grow back
+        self.heap = IndexedHeap()
+        if self.variable_order == 'mrv':
+            for region in range(count):
+                self.heap.push(region, (len(self.colors), region))
+        # Regions by static degree, preferring the last region on ties; the search always hands back the
+        # region it chose last, so the chosen regions are a prefix of this order and the count finds the next
+        self.order = sorted(range(count), key=lambda region: (self.degrees[region], region), reverse=True)
+        self.chosen = 0
+        # Statistics of the solve, shared with the CSP
+        self.stats = csp.stats
+        # Deadline, node budget and cancellation flag shared with the CSP, or None
+        self.cutoff = csp.cutoff
+        # Deepest path reached as (region, color bit) pairs, tracked while a cutoff is set,
+        # and how many of its leading pairs the current path still shares
+        self.deepest = []
+        self.shared = 0
+
+    # Yield every colouring as {region: color}, keeping the search paused between them
+    def solutions(self):
+
+        stats = self.stats
+
+        # Make the initial domains arc consistent before the first choice
+        if not self.propagate(range(len(self.regions))):
+            return
+
+        region = self.select()
+        if region is None:
+            yield self.getColoring()
+            return
+
+        # Stack of [region, color bits in order, number tried, trail mark]
+        frames = [[region, self.orderValues(region), 0, len(self.trail)]]
+
+        while frames:
+            frame = frames[-1]
+            region, values, tried, mark = frame
+
+            # Undo the color tried last at this node
+            self.undo(mark)
+
+            # Hand the region back once its colors are used up
+            if tried == len(values):
+                self.release(region)
+                frames.pop()
+
+                stats.backtracks += 1
+                if stats.hook is not None:
+                    stats.hook('backtracks', stats)
+                continue
+
+            frame[2] += 1
+            # The path leaves the deepest one at this node at the latest
+            self.shared = min(self.shared, len(frames) - 1)
+
+            # Color the region and open the next node unless propagation wipes out a domain
+            if self.assign(region, values[tried]):
+
+                # Note the deepest colouring so far and give up once the cutoff is reached
+                if self.cutoff is not None:
+                    self.noteDepth(frames)
+                    self.cutoff.check(stats)
+
+                following = self.select()
+
+                if following is None:
+                    yield self.getColoring()
+                else:
+                    frames.append([following, self.orderValues(following), 0, len(self.trail)])
+
+    # Get the colouring of a search where every domain holds one color
+    def getColoring(self):
+
+        return {region: self.colors[self.domains[index].bit_length() - 1] for index, region in enumerate(self.regions)}
+
+    # Keep the path if it is the deepest yet, copying only the pairs it no longer shares with the last one
+    def noteDepth(self, frames):
+
+        if len(frames) > len(self.deepest):
+            self.deepest[self.shared:] = [(frame[0], frame[1][frame[2] - 1]) for frame in frames[self.shared:]]
+            self.shared = len(frames)
+
+    # Get the deepest consistent colouring reached as {region: color}
+    def getPartial(self):
+
+        return {self.regions[region]: self.colors[bit.bit_length() - 1] for region, bit in self.deepest}
+
+    # Choose the next region to colour, or None if every region has been chosen
+    def select(self):
+
+        stats = self.stats
+        stats.nodes += 1
+        if stats.hook is not None:
+            stats.hook('nodes', stats)
+
+        start = time.perf_counter()
+        if self.chosen == len(self.regions):
+            return None
+
+        # Fewest live colors, lowest id first, from the top of the heap
+        if self.variable_order == 'mrv':
+            region = self.heap.pop()
+            stats.time('minimumRemainingValue', start)
+
+        # Otherwise the most constraints, preferring the last region on ties as the recursive search does
+        else:
+            region = self.order[self.chosen]
+            stats.time('degreeHeuristic', start)
+
+        self.assigned[region] = True
+        self.chosen += 1
+        return region
+
+    # Hand a chosen region back to the selector
+    def release(self, region):
+
+        self.assigned[region] = False
+        self.chosen -= 1
+
+        if self.variable_order == 'mrv':
+            self.heap.push(region, (bin(self.domains[region]).count('1'), region))
+
+    # Move an unchosen region to its place in the heap after its domain changes
+    def resize(self, region):
+
+        if region in self.heap:
+            self.heap.update(region, (bin(self.domains[region]).count('1'), region))
+
+    # Order a region's live color bits, least constraining first
+    def orderValues(self, region):
+
+        domain = self.domains[region]
+        values = []
+        while domain:
+            bit = domain & -domain
+            values.append(bit)
+            domain ^= bit
+
+        if self.value_order != 'lcv' or len(values) < 2:
+            return values
+
+        # Count the unassigned neighbors that could still take each color
+        start = time.perf_counter()
+        domains, assigned = self.domains, self.assigned
+        neighbors = [neighbor for neighbor in self.targets[self.offsets[region]:self.offsets[region + 1]] if neighbor < len(assigned) and not assigned[neighbor]]
+        values.sort(key=lambda bit: sum(1 for neighbor in neighbors if domains[neighbor] & bit))
+        self.stats.time('leastConstrainingValue', start)
+
+        return values
+
+    # Narrow a region to one color bit and propagate, returning false if a domain empties
+    def assign(self, region, bit):
+
+        self.trail.append((region, self.domains[region]))
+        self.domains[region] = bit
+
+        return self.propagate([region])
+
+    # Run AC-3 from the arcs pointing at changed regions, returning false if a domain empties
+    def propagate(self, changed):
+
+        start = time.perf_counter()
+        queue = deque(changed)
+        queued = set(changed)
+        offsets, targets, reverse = self.offsets, self.targets, self.reverse
+        consistent = True
+
+        while queue and consistent:
+            y = queue.popleft()
+            queued.discard(y)
+
+            # Revise every arc x -> y into the changed region
+            for position in range(offsets[y], offsets[y + 1]):
+                x = targets[position]
+                if x >= len(self.regions):
+                    continue
+
+                if self.revise(x, reverse[position], y):
+                    if not self.domains[x]:
+                        consistent = False
+                        break
+                    if x not in queued:
+                        queue.append(x)
+                        queued.add(x)
+
+        self.stats.time('arcConsistency', start)
+        return consistent
+
+    # Remove the colors of x with no support in y, using and refreshing the residual supports of the arc
+    def revise(self, x, position, y):
+
+        domains, residues = self.domains, self.residues
+        dx, dy = domains[x], domains[y]
+        base = position * len(self.colors)
+        removed = 0
+        checks = 0
+
+        values = dx
+        while values:
+            bit = values & -values
+            values ^= bit
+            slot = base + bit.bit_length() - 1
+            checks += 1
+
+            # The last support found is still live
+            if dy & residues[slot]:
+                continue
+
+            # Otherwise any other color of y supports this one under the not-equal constraint
+            others = dy & ~bit
+            if others:
+                residues[slot] = others & -others
+            else:
+                removed |= bit
+
+        stats = self.stats
+        stats.checks += checks
+        if stats.hook is not None:
+            stats.hook('checks', stats)
+
+        if not removed:
+            return False
+
+        self.trail.append((x, dx))
+        domains[x] = dx & ~removed
+        self.resize(x)
+        stats.countRevision(bin(removed).count('1'))
+        return True
+
+    # Undo every domain change made since a marker
+    def undo(self, mark):
+
+        trail, domains = self.trail, self.domains
+
+        while len(trail) > mark:
+            region, domain = trail.pop()
+            domains[region] = domain
+            self.resize(region)
+
+# Wrap a min-conflicts local search with breakout weights over the adjacency index
+#
+# Every region always holds a color. Each step picks a random conflicted region and moves it
+# to the color whose neighbors weigh least; at a local minimum it instead adds weight to the
+# region's conflicting edges, so the conflicts that keep coming back become expensive to keep.
+class MinConflictsSearch:
+
+    def __init__(self, csp, max_steps=None, seed=0, initial='greedy', sideways=0.3, deadline=None):
+
+        index = csp.index
+        # Regions to report, by id; regions only named in constraints are coloured too but left out
+        self.regions = list(csp.variables)
+        # Number of ids in the adjacency index
+        self.count = len(index.variables)
+        # Colors, by number
+        self.colors = list(csp.domains)
+        # Neighbor array and row offsets of the adjacency index
+        self.offsets = index.offsets
+        self.targets = index.targets
+        # Steps allowed before giving up, by default a hundred per region
+        self.max_steps = max_steps if max_steps is not None else 100 * self.count
+        # Seconds allowed before giving up, counted from the start of the solve, or None
+        self.deadline = deadline
+        # Initial colouring: 'greedy' for the vectorized greedy colouring or 'random'
+        self.initial = initial
+        # Chance of taking a color that weighs the same as the current one instead of adding weight
+        self.sideways = sideways
+        # Seed of the initial colouring and of the moves
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # Color number of each region
+        self.coloring = array('l')
+        # Weight of each edge, by arc position, and the position of the reverse arc
+        self.weights = array('l')
+        self.reverse = array('l')
+        # Total weight of each region's neighbors holding each color, at region * colors + color;
+        # a region is in conflict while the entry for its own color is above zero
+        self.weighted = array('l')
+        # Regions in conflict, in no order, and the position of each in that list or -1
+        self.conflicted = []
+        self.positions = array('l')
+        # Statistics of the solve, shared with the CSP
+        self.stats = csp.stats
+        # Deadline, node budget and cancellation flag shared with the CSP, or None
+        self.cutoff = csp.cutoff
+
+    # Search for a colouring with no conflicts, returning {region: color} or 'failure'
+    def solve(self):
+
+        count, colors = self.count, len(self.colors)
+        if not colors:
+            return 'failure' if count else {}
+
+        stop = time.perf_counter() + self.deadline if self.deadline is not None else None
+        self.initialize()
+
+        coloring, weighted, conflicted = self.coloring, self.weighted, self.conflicted
+        rng, stats = self.rng, self.stats
+
+        for step in range(self.max_steps):
+
+            if not conflicted:
+                return self.getColoring()
+
+            # Read the clock only every thousand steps or so, since a step takes about a microsecond
+            if stop is not None and not step & 1023 and time.perf_counter() > stop:
+                break
+
+            # Count each step as a node
+            stats.nodes += 1
+            if stats.hook is not None:
+                stats.hook('nodes', stats)
+            if self.cutoff is not None:
+                self.cutoff.check(stats)
+
+            # Pick a conflicted region in constant time
+            region = conflicted[rng.randrange(len(conflicted))]
+            current = coloring[region]
+            base = region * colors
+
+            # Find the color whose neighbors weigh least, breaking ties uniformly at random in one pass
+            here = weighted[base + current]
+            choice, lightest, ties = current, here, 1
+            for color in range(colors):
+                if color == current:
+                    continue
+
+                weight = weighted[base + color]
+                if weight < lightest:
+                    choice, lightest, ties = color, weight, 1
+                elif weight == lightest:
+                    ties += 1
+                    if rng.randrange(ties) == 0:
+                        choice = color
+
+            # Move if that is an improvement, or now and then if it is only as good
+            if lightest < here or (choice != current and rng.random() < self.sideways):
+                self.move(region, current, choice)
+
+            # Otherwise the region is at a local minimum; make its conflicts costlier
+            else:
+                self.breakout(region, current)
+
+        if not conflicted:
+            return self.getColoring()
+
+        return 'failure'
+
+    # Recolor a region, shifting its edge weights between colors at each neighbor
+    def move(self, region, old, new):
+
+        colors, coloring, weighted, weights = len(self.colors), self.coloring, self.weighted, self.weights
+        targets = self.targets
+        coloring[region] = new
+
+        for position in range(self.offsets[region], self.offsets[region + 1]):
+            neighbor = targets[position]
+            weight = weights[position]
+            base = neighbor * colors
+            weighted[base + old] -= weight
+            weighted[base + new] += weight
+
+            # Only neighbors holding either color change conflict status
+            color = coloring[neighbor]
+            if color == old and not weighted[base + old]:
+                self.discard(neighbor)
+            elif color == new:
+                self.add(neighbor)
+
+        if weighted[region * colors + new]:
+            self.add(region)
+        else:
+            self.discard(region)
+
+    # Add one to the weight of every edge joining a region to a neighbor of the same color
+    def breakout(self, region, color):
+
+        colors, coloring, weighted, weights, reverse = len(self.colors), self.coloring, self.weighted, self.weights, self.reverse
+        targets = self.targets
+
+        for position in range(self.offsets[region], self.offsets[region + 1]):
+            neighbor = targets[position]
+            if coloring[neighbor] == color:
+                weights[position] += 1
+                weights[reverse[position]] += 1
+                weighted[region * colors + color] += 1
+                weighted[neighbor * colors + color] += 1
+
+    # Add a region to the conflicted set unless it is already there
+    def add(self, region):
+
+        if self.positions[region] < 0:
+            self.positions[region] = len(self.conflicted)
+            self.conflicted.append(region)
+
+    # Remove a region from the conflicted set by swapping the last region into its place
+    def discard(self, region):
+
+        position = self.positions[region]
+        if position < 0:
+            return
+
+        last = self.conflicted.pop()
+        if last != region:
+            self.conflicted[position] = last
+            self.positions[last] = position
+        self.positions[region] = -1
+
+    # Give every region a color and build the weight tables, vectorized over the edges
+    def initialize(self):
+
+        # Import numpy on first use so importing the solver stays fast
+        import numpy
+
+        count, colors = self.count, len(self.colors)
+        offsets = numpy.array(self.offsets, dtype=numpy.int64)
+        targets = numpy.array(self.targets, dtype=numpy.int64)
+        sources = numpy.repeat(numpy.arange(count, dtype=numpy.int64), numpy.diff(offsets))
+
+        if self.initial == 'greedy':
+            coloring = self.greedyColoring(numpy, offsets, targets, sources)
+        else:
+            coloring = numpy.random.default_rng(self.seed).integers(0, colors, count)
+
+        # Find each arc's reverse by looking its (target, source) key up among the sorted (source, target) keys
+        keys = sources * count + targets
+        order = numpy.argsort(keys, kind='stable')
+        reverse = order[numpy.searchsorted(keys[order], targets * count + sources)]
+
+        # Every edge starts with weight one, so the tables start as plain color counts
+        weighted = numpy.bincount(sources * colors + coloring[targets], minlength=count * colors)
+
+        self.coloring = array('l', coloring.tolist())
+        self.reverse = array('l', reverse.tolist())
+        self.weights = array('l', [1]) * len(self.targets)
+        self.weighted = array('l', weighted.tolist())
+
+        self.positions = array('l', [-1]) * count
+        self.conflicted = []
+        for region in numpy.flatnonzero(weighted[numpy.arange(count) * colors + coloring]).tolist():
+            self.add(region)
+
+    # Color greedily in rounds, returning the color number of each region
+    #
+    # Each round colors every uncolored region that outranks its uncolored neighbors, ranking
+    # by degree and then at random, and gives it the color its colored neighbors use least, so
+    # the whole map is done in a few vectorized passes over the edges instead of one step per region.
+    def greedyColoring(self, numpy, offsets, targets, sources):
+
+        count, colors = self.count, len(self.colors)
+
+        # Rank regions by degree, then at random, so the most constrained go first
+        order = numpy.lexsort((numpy.random.default_rng(self.seed).random(count), numpy.diff(offsets)))
+        rank = numpy.empty(count, dtype=numpy.int64)
+        rank[order] = numpy.arange(count)
+
+        coloring = numpy.full(count, -1, dtype=numpy.int64)
+        uncolored = numpy.ones(count, dtype=bool)
+        # Arcs whose source is outranked by their target, so the source waits while the target is uncolored
+        waits = rank[targets] > rank[sources]
+
+        while uncolored.any():
+
+            # Regions with no uncolored neighbor ranked above them go this round
+            ready = uncolored.copy()
+            ready[sources[waits & uncolored[targets]]] = False
+            chosen = numpy.flatnonzero(ready)
+
+            # Count each color among the colored neighbors of the chosen regions
+            slot = numpy.full(count, -1, dtype=numpy.int64)
+            slot[chosen] = numpy.arange(len(chosen))
+            taken = ready[sources] & ~uncolored[targets]
+            counts = numpy.bincount(slot[sources[taken]] * colors + coloring[targets[taken]], minlength=len(chosen) * colors)
+
+            coloring[chosen] = counts.reshape(len(chosen), colors).argmin(axis=1)
+            uncolored[chosen] = False
+
+        return coloring
+
+    # Get the colouring of the regions to report as {region: color}
+    def getColoring(self):
+
+        return {region: self.colors[self.coloring[index]] for index, region in enumerate(self.regions)}
+
+# Search options of batch solves unless told otherwise: DSATUR, whose incremental saturation
+# does not lose colors the way the legacy LCV ordering can
+BATCH_OPTIONS = {'variable_order': 'dsatur', 'value_order': 'domain'}
+
+# Solve a chunk of (index, (variables, domains, constraints)) instances in a worker process
+#
+# Each instance gets its own deadline in seconds and/or node budget; one that runs out reports
+# the reason, 'deadline' or 'budget', in place of a colouring.
+def solveChunk(chunk, deadline=None, budget=None, **options):
+
+    options = dict(BATCH_OPTIONS, **options)
+    results = []
+
+    for index, instance in chunk:
+        csp = CSP(*instance, **options)
+
+        if deadline is None and budget is None:
+            results.append((index, csp.solve()))
+            continue
+
+        outcome = csp.solveWithin(deadline, budget)
+        results.append((index, outcome['solution'] if outcome['status'] == 'solved' else outcome['status']))
+
+    return results
+
+# Solve one piece of a decomposed map in a worker process, returning (result, stats)
+def solvePiece(instance, domains, options, restart_base=100):
+
+    variables, constraints = instance
+    piece = CSP(variables, domains, constraints, **options)
+    piece.restart_base = restart_base
+
+    return piece.solve(), piece.stats
+
+# Solve many instances on a pool of worker processes, yielding (index, {region: color} or 'failure')
+#
+# Any other keyword, such as variable_order, value_order, representation or restarts, is passed to
+# every CSP over BATCH_OPTIONS. A deadline or budget applies to each instance, as in solveChunk.
+def solveBatch(instances, workers=None, chunksize=64, ordered=True, deadline=None, budget=None, **options):
+
+    # Import the process pool on first use so importing the solver stays fast
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+    # Use every core unless told otherwise
+    workers = workers or os.cpu_count() or 1
+    # Number the instances and read them lazily, one chunk at a time
+    numbered = enumerate(instances)
+    # Keep a couple of chunks per worker in flight so the pool never waits on the input
+    window = 2 * workers
+
+    with ProcessPoolExecutor(workers) as executor:
+
+        # Futures of the chunks in flight, oldest first
+        pending = deque()
+
+        # Submit the next chunk of instances, returning false once the input runs out
+        def submit():
+            chunk = list(islice(numbered, chunksize))
+            if chunk:
+                pending.append(executor.submit(solveChunk, chunk, deadline, budget, **options))
+            return bool(chunk)
+
+        while len(pending) < window and submit():
+            pass
+
+        while pending:
+
+            # Stream results in input order by waiting on the oldest chunk
+            if ordered:
+                done = [pending.popleft()]
+
+            # Otherwise stream whichever chunks finish first
+            else:
+                finished = wait(pending, return_when=FIRST_COMPLETED)[0]
+                done = [future for future in pending if future in finished]
+                for future in done:
+                    pending.remove(future)
+
+            for future in done:
+                submit()
+                yield from future.result()
+
+# Solve and print the demo problems
+def demo():
+
+    # Binary Constraints
+    c1 = ('wa', 'sa')
+    c2 = ('wa', 'nt')
+    c3 = ('sa', 'nt')
+    c4 = ('nt', 'q')
+    c5 = ('sa', 'q')
+    c6 = ('q', 'nsw')
+    c7 = ('sa', 'nsw')
+    c8 = ('nsw', 'v')
+    c9 = ('sa', 'v')
+    c10 = ('t')
+
+    # Constraints
+    constraints = [c1, c2, c3, c4, c5, c6, c7, c8, c9, c10]
+
+    # Variables
+    variables = ['sa', 'wa', 'nt', 'q', 'nsw', 'v', 't']
+
+    # Domains
+    domains = ['r', 'g', 'b']
+
+    map_problem = CSP(variables, domains, constraints)
+
+    print(map_problem.csp_solver())
+
+if __name__ == '__main__':
+    demo()
@@ -0,0 +1,609 @@
+# SAT encodings of the map colouring and circuit board CSPs, DIMACS CNF output and a CDCL solver
+#
+# Formulas use DIMACS conventions: variables are numbered from 1 and a clause is a list of
+# nonzero integers, -v standing for the negation of variable v. The solver needs nothing
+# outside the standard library, so no external SAT solver has to be installed.
+import gzip
+import heapq
+import os
+from .instrumentation import SearchStats, restartLimits
+
+# Largest group of literals given pairwise at-most-one clauses; larger groups use a sequential counter
+PAIRWISE_LIMIT = 6
+
+# Wrap a CNF formula under construction
+class Formula:
+
+    def __init__(self):
+
+        # Number of variables used so far
+        self.count = 0
+        # Clauses as lists of DIMACS literals
+        self.clauses = []
+
+    # Get a fresh variable
+    def newVariable(self):
+
+        self.count += 1
+        return self.count
+
+    # Add a clause; an empty clause makes the formula unsatisfiable
+    def addClause(self, literals):
+
+        self.clauses.append(list(literals))
+
+    # Require at most one of the literals to be true
+    def atMostOne(self, literals):
+
+        literals = list(literals)
+
+        # Small groups take one clause per pair
+        if len(literals) <= PAIRWISE_LIMIT:
+            for i in range(0, len(literals)):
+                for j in range(i + 1, len(literals)):
+                    self.addClause([-literals[i], -literals[j]])
+            return
+
+        # Larger ones a sequential counter, whose ith variable is true once one of the first i literals is
+        previous = self.newVariable()
+        self.addClause([-literals[0], previous])
+
+        for literal in literals[1:-1]:
+            current = self.newVariable()
+            self.addClause([-literal, current])
+            self.addClause([-previous, current])
+            self.addClause([-literal, -previous])
+            previous = current
+
+        self.addClause([-literals[-1], -previous])
+
+    # Require exactly one of the literals to be true
+    def exactlyOne(self, literals):
+
+        literals = list(literals)
+        self.addClause(literals)
+        self.atMostOne(literals)
+
+    # Write the formula as DIMACS CNF to a path, gzip-compressed if it ends in .gz, or to an open text file
+    def writeDimacs(self, target, comments=()):
+
+        if isinstance(target, (str, bytes, os.PathLike)):
+            compressed = os.fspath(target)[-3:] in ('.gz', b'.gz')
+            with (gzip.open(target, 'wt') if compressed else open(target, 'w')) as handle:
+                self.writeDimacs(handle, comments)
+            return
+
+        for comment in comments:
+            target.write('c %s\n' % comment)
+
+        target.write('p cnf %d %d\n' % (self.count, len(self.clauses)))
+        for clause in self.clauses:
+            target.write(' '.join(map(str, clause)) + ' 0\n' if clause else '0\n')
+
+# Wrap the SAT encoding of a map colouring CSP, with one variable per (region, color)
+class MapEncoding:
+
+    def __init__(self, csp):
+
+        index = csp.index
+        # Regions to report, by id; regions only named in constraints are encoded too but left out
+        self.regions = list(csp.variables)
+        # Colors, by number
+        self.colors = list(csp.domains)
+        self.formula = Formula()
+
+        count, colors = len(index.variables), len(self.colors)
+
+        # Region id i takes color c when variable i * colors + c + 1 is true
+        self.formula.count = count * colors
+
+        for region in range(count):
+
+            # Every region takes exactly one color
+            self.formula.exactlyOne([self.variable(region, color) for color in range(colors)])
+
+            # And no color of a neighbor; each edge is encoded once, from its lower id
+            for neighbor in index.neighborIds(region):
+                if region < neighbor:
+                    for color in range(colors):
+                        self.formula.addClause([-self.variable(region, color), -self.variable(neighbor, color)])
+
+    # Get the variable of a region id taking a color number
+    def variable(self, region, color):
+
+        return region * len(self.colors) + color + 1
+
+    # Get the colouring a model describes as {region: color}
+    def decode(self, model):
+
+        colors = range(len(self.colors))
+
+        return {region: self.colors[next(color for color in colors if model[self.variable(index, color)])] for index, region in enumerate(self.regions)}
+
+# Wrap the SAT encoding of a circuit board CSP, with one variable per placement of each component
+class BoardEncoding:
+
+    def __init__(self, variables, bitboard):
+
+        # Component names, in order
+        self.names = list(variables)
+        # Placements of each component as {variable: location}
+        self.placements = []
+        self.formula = Formula()
+
+        # Placement variables covering each cell, by bit index
+        cells = {}
+
+        for name in self.names:
+            placements = {}
+
+            for location, mask in bitboard.masks[variables[name]].items():
+                variable = self.formula.newVariable()
+                placements[variable] = location
+
+                # Note the cells the placement covers
+                while mask:
+                    low = mask & -mask
+                    cells.setdefault(low.bit_length() - 1, []).append(variable)
+                    mask ^= low
+
+            # Every component takes exactly one placement
+            self.formula.exactlyOne(placements)
+            self.placements.append(placements)
+
+        # No cell is covered twice
+        for covering in cells.values():
+            if len(covering) > 1:
+                self.formula.atMostOne(covering)
+
+        # Components with more area than the board cannot all fit, which the clauses above
+        # only show through a pigeonhole proof that is exponential for CDCL; state it outright
+        area = sum(w * h for w, h in variables.values())
+        if area > bitboard.width * bitboard.height:
+            self.formula.addClause([])
+
+        # Components that tile the board exactly also cover every cell, which propagates much sooner
+        elif area == bitboard.width * bitboard.height:
+            for cell in range(0, area):
+                self.formula.addClause(cells.get(cell, []))
+
+    # Get the layout a model describes as {component name: [location]}
+    def decode(self, model):
+
+        return {name: [next(location for variable, location in self.placements[index].items() if model[variable])] for index, name in enumerate(self.names)}
+
+# Wrap a conflict-driven clause learning (CDCL) SAT solver
+#
+# Unit propagation watches two literals per clause. Each conflict is analysed back to its
+# first unique implication point and the learned clause drives a non-chronological
+# backjump. Decisions follow VSIDS activity with saved phases, the search restarts on a
+# Luby schedule of conflicts, and learned clauses with many decision levels are dropped.
+class CDCLSolver:
+
+    def __init__(self, formula, hook=None):
+
+        count = formula.count
+        # Number of variables
+        self.count = count
+        # Value of each literal, 1 true, -1 false or 0 unassigned; variable v has literals 2v and 2v + 1 for not v
+        self.values = [0] * (2 * count + 2)
+        # Decision level and reason clause, or None for decisions, of each assigned variable
+        self.levels = [0] * (count + 1)
+        self.reasons = [None] * (count + 1)
+        # Literals made true, in order, with the trail length at the start of each decision level
+        self.trail = []
+        self.limits = []
+        # Position of the next trail literal to propagate
+        self.head = 0
+        # Clauses as lists of literals, the first two being watched; deleted clauses are None
+        self.clauses = []
+        # Clauses of three or more literals watching each literal, visited when it becomes false
+        self.watches = [[] for literal in range(2 * count + 2)]
+        # Binary clauses as (other literal, clause index) pairs under each literal, implied when it becomes false
+        self.binary = [[] for literal in range(2 * count + 2)]
+        # Learned clauses and the number of decision levels in each when it was learned (LBD)
+        self.learned = []
+        self.lbd = {}
+        # Learned clauses kept before the database is reduced, growing a little each time
+        self.max_learned = max(2000, len(formula.clauses) // 3)
+        # VSIDS activity of each variable, the amount added by the next bump and its growth per conflict
+        self.activity = [0.0] * (count + 1)
+        self.increment = 1.0
+        self.decay = 0.95
+        # Heap of (-activity, variable) with stale entries skipped when popped, and whether each
+        # variable has an entry at its current activity, so unassigning it need not push another
+        self.heap = [(0.0, variable) for variable in range(1, count + 1)]
+        self.queued = [True] * (count + 1)
+        # Last value of each variable, reused when it is decided again
+        self.phases = [False] * (count + 1)
+        # Marks used while analysing a conflict
+        self.seen = [False] * (count + 1)
+        # Restart schedule over conflicts: 'luby' or 'geometric', and the conflicts allowed in the first run
+        self.restarts = 'luby'
+        self.restart_base = 100
+        # Counters: nodes are decisions, backtracks conflicts, nogoods learned clauses, pruned implied literals
+        self.stats = SearchStats(hook)
+        # Deadline, node budget and cancellation flag, or None
+        self.cutoff = None
+        # Whether the clauses are already known to be unsatisfiable
+        self.unsatisfiable = False
+
+        for clause in formula.clauses:
+            self.addClause(clause)
+
+    # Add an input clause at decision level 0
+    def addClause(self, clause):
+
+        if self.unsatisfiable:
+            return
+
+        values = self.values
+        literals = []
+
+        for literal in clause:
+            literal = 2 * literal if literal > 0 else -2 * literal + 1
+
+            # A clause holding both signs of a variable, or a true literal, is already satisfied
+            if values[literal] == 1 or literal ^ 1 in literals:
+                return
+            if values[literal] == 0 and literal not in literals:
+                literals.append(literal)
+
+        if not literals:
+            self.unsatisfiable = True
+        elif len(literals) == 1:
+            self.enqueue(literals[0], None)
+        else:
+            self.watch(literals)
+
+    # Store a clause and watch its first two literals, returning its index
+    def watch(self, literals):
+
+        index = len(self.clauses)
+        self.clauses.append(literals)
+
+        # Binary clauses go straight to the implication lists
+        if len(literals) == 2:
+            self.binary[literals[0]].append((literals[1], index))
+            self.binary[literals[1]].append((literals[0], index))
+        else:
+            self.watches[literals[0]].append(index)
+            self.watches[literals[1]].append(index)
+
+        return index
+
+    # Make a literal true at the current decision level
+    def enqueue(self, literal, reason):
+
+        self.values[literal] = 1
+        self.values[literal ^ 1] = -1
+        variable = literal >> 1
+        self.levels[variable] = len(self.limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    # Propagate the trail through the watched literals, returning a conflicting clause index or None
+    #
+    # Implied literals are enqueued inline, since this loop is where the solver spends its time.
+    def propagate(self):
+
+        values, watches, binary, clauses, trail = self.values, self.watches, self.binary, self.clauses, self.trail
+        levels, reasons = self.levels, self.reasons
+        level = len(self.limits)
+        start = len(trail)
+
+        while self.head < len(trail):
+            false = trail[self.head] ^ 1
+            self.head += 1
+
+            # Binary clauses imply their other literal straight away
+            for literal, index in binary[false]:
+                value = values[literal]
+                if value == 1:
+                    continue
+                if value == -1:
+                    self.countImplied(len(trail) - start)
+                    return index
+
+                # Reason clauses hold their implied literal first
+                clause = clauses[index]
+                if clause[0] != literal:
+                    clause[0], clause[1] = literal, clause[0]
+
+                values[literal] = 1
+                values[literal ^ 1] = -1
+                levels[literal >> 1] = level
+                reasons[literal >> 1] = index
+                trail.append(literal)
+
+            watching = watches[false]
+            watches[false] = kept = []
+
+            for position, index in enumerate(watching):
+                clause = clauses[index]
+
+                # Drop watches of deleted clauses
+                if clause is None:
+                    continue
+
+                # Keep the false literal second
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+
+                # Nothing to do while the other watch is true
+                first = clause[0]
+                if values[first] == 1:
+                    kept.append(index)
+                    continue
+
+                # Move the watch to a literal that is not false
+                for other in range(2, len(clause)):
+                    literal = clause[other]
+                    if values[literal] != -1:
+                        clause[1], clause[other] = literal, false
+                        watches[literal].append(index)
+                        break
+
+                # Otherwise the clause is unit or in conflict
+                else:
+                    kept.append(index)
+
+                    if values[first] == -1:
+                        kept.extend(watching[position + 1:])
+                        self.countImplied(len(trail) - start)
+                        return index
+
+                    values[first] = 1
+                    values[first ^ 1] = -1
+                    levels[first >> 1] = level
+                    reasons[first >> 1] = index
+                    trail.append(first)
+
+        self.countImplied(len(trail) - start)
+        return None
+
+    # Count the literals unit propagation has implied
+    def countImplied(self, implied):
+
+        if implied:
+            stats = self.stats
+            stats.pruned += implied
+            if stats.hook is not None:
+                stats.hook('pruned', stats)
+
+    # Find the first unique implication point of a conflict, returning (learned clause, backjump level)
+    def analyze(self, conflict):
+
+        seen, levels, reasons, trail, clauses = self.seen, self.levels, self.reasons, self.trail, self.clauses
+        level = len(self.limits)
+
+        # The asserting literal goes first once it is known
+        learned = [None]
+        pending = 0
+        position = len(trail) - 1
+        clause, start = clauses[conflict], 0
+
+        while True:
+
+            # Mark the variables of the clause, counting those at the conflict level still to resolve
+            for literal in clause[start:]:
+                variable = literal >> 1
+                if not seen[variable] and levels[variable] > 0:
+                    seen[variable] = True
+                    self.bump(variable)
+                    if levels[variable] >= level:
+                        pending += 1
+                    else:
+                        learned.append(literal)
+
+            # Resolve with the reason of the latest marked literal on the trail
+            while not seen[trail[position] >> 1]:
+                position -= 1
+            literal = trail[position]
+            position -= 1
+            variable = literal >> 1
+            seen[variable] = False
+            pending -= 1
+
+            if not pending:
+                break
+
+            # Reason clauses hold their implied literal first
+            clause, start = clauses[reasons[variable]], 1
+
+        learned[0] = literal ^ 1
+
+        for literal in learned[1:]:
+            seen[literal >> 1] = False
+
+        # Jump back to the deepest level among the other literals, which is watched second
+        if len(learned) == 1:
+            return learned, 0
+
+        deepest = max(range(1, len(learned)), key=lambda index: levels[learned[index] >> 1])
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+
+        return learned, levels[learned[1] >> 1]
+
+    # Add to a variable's activity, rescaling every activity before they overflow
+    def bump(self, variable):
+
+        self.activity[variable] += self.increment
+        # Its heap entry, if any, is now stale
+        self.queued[variable] = False
+
+        if self.activity[variable] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.increment *= 1e-100
+            self.rebuildHeap()
+
+    # Rebuild the heap from the unassigned variables, dropping every stale entry
+    def rebuildHeap(self):
+
+        values, activity, queued = self.values, self.activity, self.queued
+        self.heap = []
+
+        for variable in range(1, self.count + 1):
+            queued[variable] = not values[2 * variable]
+            if queued[variable]:
+                self.heap.append((-activity[variable], variable))
+
+        heapq.heapify(self.heap)
+
+    # Undo every assignment above a decision level, saving the phases
+    def backjump(self, level):
+
+        if len(self.limits) <= level:
+            return
+
+        values, reasons, phases, activity, heap, queued = self.values, self.reasons, self.phases, self.activity, self.heap, self.queued
+        mark = self.limits[level]
+
+        for literal in self.trail[mark:]:
+            variable = literal >> 1
+            values[literal] = values[literal ^ 1] = 0
+            reasons[variable] = None
+            phases[variable] = not literal & 1
+            if not queued[variable]:
+                heapq.heappush(heap, (-activity[variable], variable))
+                queued[variable] = True
+
+        del self.trail[mark:]
+        del self.limits[level:]
+        self.head = mark
+
+        # Rebuild the heap once stale entries dominate it
+        if len(heap) > 4 * self.count + 64:
+            self.rebuildHeap()
+
+    # Choose the unassigned variable with the highest activity, returning its literal in its saved phase or None
+    def decide(self):
+
+        heap, values, activity, queued = self.heap, self.values, self.activity, self.queued
+
+        while heap:
+            key, variable = heapq.heappop(heap)
+
+            # Skip entries left behind by a bump; a fresher one is queued or will be on unassignment
+            if -key != activity[variable]:
+                continue
+
+            queued[variable] = False
+            if not values[2 * variable]:
+                return 2 * variable if self.phases[variable] else 2 * variable + 1
+
+        # Stale entries may hide a variable; look for one directly before declaring a model
+        for variable in range(1, self.count + 1):
+            if not values[2 * variable]:
+                return 2 * variable if self.phases[variable] else 2 * variable + 1
+
+        return None
+
+    # Learn a clause from a conflict and assert its first literal
+    def learn(self, learned):
+
+        if len(learned) == 1:
+            self.enqueue(learned[0], None)
+            return
+
+        index = self.watch(learned)
+        self.learned.append(index)
+        self.lbd[index] = len({self.levels[literal >> 1] for literal in learned})
+        self.enqueue(learned[0], index)
+
+        stats = self.stats
+        stats.nogoods += 1
+        if stats.hook is not None:
+            stats.hook('nogoods', stats)
+
+    # Drop the less useful half of the learned clauses, keeping short-range ones and current reasons
+    def reduce(self):
+
+        clauses, reasons, values, lbd = self.clauses, self.reasons, self.values, self.lbd
+        kept = []
+
+        # Worst first: many decision levels, then long
+        ranked = sorted(self.learned, key=lambda index: (lbd[index], len(clauses[index])), reverse=True)
+
+        for rank, index in enumerate(ranked):
+            clause = clauses[index]
+            locked = reasons[clause[0] >> 1] == index and values[clause[0]] == 1
+
+            if rank < len(ranked) // 2 and not locked and lbd[index] > 2 and len(clause) > 2:
+                clauses[index] = None
+                del lbd[index]
+            else:
+                kept.append(index)
+
+        self.learned = kept
+        self.max_learned += self.max_learned // 10
+
+    # Search until a model is found, the clauses are refuted or limit conflicts have passed
+    #
+    # Returns True, False, or None to ask for a restart.
+    def search(self, limit):
+
+        stats = self.stats
+        conflicts = 0
+
+        while True:
+            conflict = self.propagate()
+
+            if conflict is not None:
+                stats.backtracks += 1
+                if stats.hook is not None:
+                    stats.hook('backtracks', stats)
+
+                # A conflict with no decisions refutes the clauses
+                if not self.limits:
+                    return False
+
+                conflicts += 1
+                learned, level = self.analyze(conflict)
+                self.backjump(level)
+                self.learn(learned)
+                self.increment /= self.decay
+                continue
+
+            if conflicts >= limit:
+                return None
+
+            if len(self.learned) >= self.max_learned:
+                self.reduce()
+
+            literal = self.decide()
+            if literal is None:
+                return True
+
+            # Count the decision and give up once the cutoff is reached
+            stats.nodes += 1
+            if stats.hook is not None:
+                stats.hook('nodes', stats)
+            if self.cutoff is not None:
+                self.cutoff.check(stats)
+
+            self.limits.append(len(self.trail))
+            self.enqueue(literal, None)
+
+    # Solve the formula, returning a model as a list of booleans indexed by variable, or None if it is unsatisfiable
+    def solve(self):
+
+        if self.unsatisfiable:
+            return None
+
+        stats = self.stats
+
+        for limit in restartLimits(self.restarts, self.restart_base):
+            result = self.search(limit)
+
+            if result is True:
+                return [False] + [self.values[2 * variable] == 1 for variable in range(1, self.count + 1)]
+            if result is False:
+                self.unsatisfiable = True
+                return None
+
+            # Start again from the top, keeping the learned clauses, activities and phases
+            self.backjump(0)
+            stats.restarts += 1
+            if stats.hook is not None:
+                stats.hook('restarts', stats)